@@ -0,0 +1,120 @@
+"""
+JWT authentication that trusts the token claims instead of loading the user.
+
+Access tokens carry the user's ``role`` and ``token_version``. Requests are
+authenticated from those claims alone (see ``User.from_token_claims``), so
+permission checks and queryset scoping cost no query. Any change to a
+user's role, active flag or password bumps ``token_version``; each process
+keeps the versions of recently changed users, refreshed from the database at
+most every ``JWT_CHANGED_USERS_TTL`` seconds, and rejects tokens that carry
+an older version.
+"""
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import User
+
+# Allowance for transactions that stamped updated_at before the previous
+# refresh but committed after it
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's role and token version"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['token_version'] = user.token_version
+        return token
+
+
+class ChangedUsers:
+    """
+    Current token versions of users changed within the access token lifetime.
+
+    Only users absent from this map can be trusted on their claims alone
+    beyond the version check, which is why the window matches the lifetime
+    of the tokens being checked.
+    """
+
+    def __init__(self, ttl, retention):
+        self.ttl = ttl
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._refreshed_at = None
+        self._checked_at = 0.0
+
+    def record(self, user_id, token_version, is_active):
+        with self._lock:
+            self._versions[user_id] = (token_version, is_active, timezone.now())
+
+    def is_revoked(self, user_id, token_version):
+        self._refresh()
+        entry = self._versions.get(user_id)
+        if entry is None:
+            return False
+        current_version, is_active, _seen_at = entry
+        return not is_active or current_version != token_version
+
+    def _refresh(self):
+        if time.monotonic() - self._checked_at < self.ttl:
+            return
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.ttl:
+                return
+            now = timezone.now()
+            since = self._refreshed_at - REFRESH_OVERLAP if self._refreshed_at else now - self.retention
+            changed = User.objects.filter(updated_at__gte=since).values_list('id', 'token_version', 'is_active')
+            for user_id, token_version, is_active in changed:
+                self._versions[user_id] = (token_version, is_active, now)
+            cutoff = now - self.retention
+            self._versions = {
+                user_id: entry for user_id, entry in self._versions.items() if entry[2] >= cutoff
+            }
+            self._refreshed_at = now
+            self._checked_at = time.monotonic()
+
+
+changed_users = ChangedUsers(
+    ttl=settings.JWT_CHANGED_USERS_TTL,
+    retention=api_settings.ACCESS_TOKEN_LIFETIME,
+)
+
+
+def _record_user_change(sender, instance, **kwargs):
+    # This process sees its own changes immediately, others on their next refresh
+    transaction.on_commit(
+        lambda: changed_users.record(instance.pk, instance.token_version, instance.is_active)
+    )
+
+
+post_save.connect(_record_user_change, sender=User, dispatch_uid='jwt-changed-users')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if 'role' not in validated_token or 'token_version' not in validated_token:
+            # Issued before tokens carried the claims
+            return super().get_user(validated_token)
+
+        if changed_users.is_revoked(user_id, validated_token['token_version']):
+            raise AuthenticationFailed(_('Token is no longer valid'), code='token_revoked')
+
+        return User.from_token_claims(user_id, validated_token['role'], validated_token['token_version'])
@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.backends import ModelBackend
+from . import hashing
+from .models import User
+
+
+class OffloadedHashingBackend(ModelBackend):
+    """
+    ModelBackend that checks passwords on the bounded hashing pool and
+    upgrades hashes made with an outdated hasher or work factor.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = self._get_user(username, password, **kwargs)
+        if user is None:
+            if password is not None:
+                # Same work as a real check, so timing doesn't reveal which usernames exist
+                hashing.hash_password(password)
+            return None
+        is_correct, new_encoded = hashing.verify_password(password, user.password)
+        return self._finish(user, is_correct, new_encoded)
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        user = await sync_to_async(self._get_user)(username, password, **kwargs)
+        if user is None:
+            if password is not None:
+                await hashing.ahash_password(password)
+            return None
+        is_correct, new_encoded = await hashing.averify_password(password, user.password)
+        return await sync_to_async(self._finish)(user, is_correct, new_encoded)
+
+    def _get_user(self, username, password, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            return User._default_manager.get_by_natural_key(username)
+        except User.DoesNotExist:
+            return None
+
+    def _finish(self, user, is_correct, new_encoded):
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if new_encoded is not None:
+            # Same password under the preferred hasher: store it without
+            # going through save(), which would revoke the user's tokens
+            User.objects.filter(pk=user.pk).update(password=new_encoded)
+            user.password = new_encoded
+            user._token_values = user._token_state()
+        return user
+
+
+async def aauthenticate(request=None, **credentials):
+    """Async counterpart of django.contrib.auth.authenticate() for this backend"""
+    user = await OffloadedHashingBackend().aauthenticate(request, **credentials)
+    if user is not None:
+        user.backend = f'{OffloadedHashingBackend.__module__}.{OffloadedHashingBackend.__qualname__}'
+    return user
@@ -0,0 +1,135 @@
+"""
+Bounded executor for password hashing.
+
+PBKDF2 costs hundreds of milliseconds of CPU per call. Running it on the
+request thread lets a burst of logins occupy every worker, so checks and new
+hashes go through a small thread pool instead (hashlib, argon2 and bcrypt
+release the GIL while hashing). At most ``PASSWORD_HASHING_WORKERS`` hashes
+run at once and at most ``PASSWORD_HASHING_MAX_PENDING`` are accepted
+in total; a caller that cannot get a slot within
+``PASSWORD_HASHING_QUEUE_TIMEOUT`` seconds gets a 503 instead of waiting
+indefinitely.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, please try again shortly.'
+    default_code = 'hashing_unavailable'
+
+
+class PasswordHashingPool:
+    def __init__(self, workers, max_pending, queue_timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        # Request threads and the pool's threads both update the counters
+        self._counters_lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._count('rejected')
+            raise HashingUnavailable()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        # Waiting for a slot blocks, so do it off the event loop
+        future = await sync_to_async(self.submit, thread_sensitive=False)(fn, *args)
+        return await asyncio.wrap_future(future)
+
+    def _count(self, name):
+        with self._counters_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._counters_lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def _done(self, future):
+        self._count('completed')
+        self._slots.release()
+
+    def _get_executor(self):
+        # Forked workers must not inherit the parent's threads
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hashing')
+                    self._pid = os.getpid()
+        return self._executor
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashingPool(
+                    workers=settings.PASSWORD_HASHING_WORKERS,
+                    max_pending=settings.PASSWORD_HASHING_MAX_PENDING,
+                    queue_timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT,
+                )
+    return _pool
+
+
+def _verify(password, encoded):
+    rehashed = []
+    is_correct = hashers.check_password(
+        password, encoded, setter=lambda raw_password: rehashed.append(hashers.make_password(raw_password))
+    )
+    return is_correct, rehashed[0] if rehashed else None
+
+
+def verify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded`` on the pool.
+
+    Returns (is_correct, new_encoded); new_encoded is the password hashed
+    with the preferred hasher when ``encoded`` is outdated, else None.
+    """
+    return get_pool().run(_verify, password, encoded)
+
+
+def hash_password(password):
+    return get_pool().run(hashers.make_password, password)
+
+
+async def averify_password(password, encoded):
+    return await get_pool().arun(_verify, password, encoded)
+
+
+async def ahash_password(password):
+    return await get_pool().arun(hashers.make_password, password)
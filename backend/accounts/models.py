@@ -8,12 +8,59 @@ class User(AbstractUser):
     ]
     
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='contributor')
+    # Part of the access token claims; bumped whenever a change must
+    # invalidate tokens that were already issued
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Changing any of these revokes the user's outstanding tokens
+    TOKEN_FIELDS = ['role', 'is_active', 'password']
+    
     def __str__(self):
         return f"{self.username} ({self.role})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._token_values = instance._token_state()
+        return instance
+    
+    @classmethod
+    def from_token_claims(cls, user_id, role, token_version):
+        """
+        A user built from access token claims without touching the database.
+
+        Every other field is deferred; reading one loads the rest of the row
+        in a single query.
+        """
+        claims = {'id': user_id, 'role': role, 'token_version': token_version, 'is_active': True}
+        # from_db expects the values in field order
+        field_names = [field.attname for field in cls._meta.concrete_fields if field.attname in claims]
+        instance = cls.from_db('default', field_names, [claims[name] for name in field_names])
+        instance._from_token_claims = True
+        return instance
+    
+    def _token_state(self):
+        return {attname: self.__dict__[attname] for attname in self.TOKEN_FIELDS if attname in self.__dict__}
+    
+    def refresh_from_db(self, using=None, fields=None):
+        if fields is not None and getattr(self, '_from_token_claims', False):
+            # First access past the claims: load the whole row, not one field per query
+            self._from_token_claims = False
+            fields = list(self.get_deferred_fields())
+        super().refresh_from_db(using=using, fields=fields)
+        self._token_values = self._token_state()
+    
+    def save(self, *args, **kwargs):
+        loaded_values = getattr(self, '_token_values', None)
+        if self.pk and loaded_values is not None and self._token_state() != loaded_values:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._token_values = self._token_state()
+    
     @property
     def is_admin(self):
         return self.role == 'admin'
@@ -1,6 +1,12 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
 from django.conf import settings
+from task_tracker.fieldsets import ExpandableFieldsMixin
+from . import hashing
+from .authentication import ClaimsRefreshToken
 from .models import User
 
 
@@ -38,13 +44,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         validated_data.pop("password_confirm")
         validated_data.pop("admin_key", None)  # Remove admin_key from validated_data
         password = validated_data.pop("password")
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
+        validated_data["email"] = User.objects.normalize_email(validated_data.get("email"))
+        user = User(**validated_data)
+        user.username = user.normalize_username(user.username)
+        # Hashed on the bounded hashing pool, and saved with a single INSERT
+        user.password = hashing.hash_password(password)
         user.save()
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -68,7 +77,11 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get("password")
 
         if username and password:
-            user = authenticate(username=username, password=password)
+            if "authenticated_user" in self.context:
+                # Already checked by the async login view
+                user = self.context["authenticated_user"]
+            else:
+                user = authenticate(username=username, password=password)
             if not user:
                 raise serializers.ValidationError("Invalid credentials")
             if not user.is_active:
@@ -78,3 +91,21 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError("Must include username and password")
 
         return attrs
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuse to mint access tokens from a refresh token issued before a role, status or password change"""
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if "token_version" in refresh:
+            user = (
+                User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM], is_active=True)
+                .only("token_version")
+                .first()
+            )
+            if user is None or user.token_version != refresh["token_version"]:
+                raise InvalidToken("Token is no longer valid")
+        return super().validate(attrs)
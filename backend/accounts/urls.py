@@ -1,10 +1,18 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
+if settings.ASYNC_VIEWS:
+    register_view, login_view = views.AsyncRegisterView.as_view(), views.AsyncLoginView.as_view()
+    profile_view = views.AsyncProfileView.as_view()
+else:
+    register_view, login_view = views.RegisterView.as_view(), views.login_view
+    profile_view = views.profile_view
+
 urlpatterns = [
-    path('register/', views.RegisterView.as_view(), name='register'),
-    path('login/', views.login_view, name='login'),
-    path('profile/', views.profile_view, name='profile'),
+    path('register/', register_view, name='register'),
+    path('login/', login_view, name='login'),
+    path('profile/', profile_view, name='profile'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
@@ -2,7 +2,10 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.views import APIView
+from task_tracker.asyncviews import AsyncAPIView
+from .backends import aauthenticate
+from .authentication import ClaimsRefreshToken
 from .models import User
 from .serializers import UserRegistrationSerializer, UserSerializer, LoginSerializer
 
@@ -17,7 +20,7 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         return Response(
             {
                 "user": UserSerializer(user).data,
@@ -35,7 +38,7 @@ def login_view(request):
     serializer.is_valid(raise_exception=True)
 
     user = serializer.validated_data["user"]
-    refresh = RefreshToken.for_user(user)
+    refresh = ClaimsRefreshToken.for_user(user)
 
     return Response(
         {
@@ -48,9 +51,37 @@ def login_view(request):
 
 @api_view(["GET"])
 def profile_view(request):
-    print(f"Profile request from user: {request.user}")  # Debug log
-    print(f"User is authenticated: {request.user.is_authenticated}")  # Debug log
-    print(f"User role: {getattr(request.user, 'role', 'No role')}")  # Debug log
-
     serializer = UserSerializer(request.user)
     return Response(serializer.data)
+
+
+class AsyncRegisterView(AsyncAPIView, RegisterView):
+    pass
+
+
+class AsyncLoginView(AsyncAPIView, APIView):
+    """login_view, waiting for the password check without holding a thread"""
+
+    permission_classes = [AllowAny]
+
+    async def post(self, request):
+        user = await aauthenticate(
+            request, username=request.data.get("username"), password=request.data.get("password")
+        )
+        serializer = LoginSerializer(data=request.data, context={"authenticated_user": user})
+        serializer.is_valid(raise_exception=True)
+
+        refresh = ClaimsRefreshToken.for_user(user)
+        return Response(
+            {
+                "user": UserSerializer(user).data,
+                "refresh": str(refresh),
+                "access": str(refresh.access_token),
+            }
+        )
+
+
+class AsyncProfileView(AsyncAPIView, APIView):
+    async def get(self, request):
+        user = await User.objects.aget(pk=request.user.pk)
+        return Response(UserSerializer(user).data)
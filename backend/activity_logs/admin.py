@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ActivityLog
+from .models import ActivityLog, TaskEvent
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
@@ -7,3 +7,10 @@ class ActivityLogAdmin(admin.ModelAdmin):
     list_filter = ['previous_status', 'updated_at']
     search_fields = ['task__title', 'task__description']
     readonly_fields = ['updated_at']
+
+@admin.register(TaskEvent)
+class TaskEventAdmin(admin.ModelAdmin):
+    list_display = ['task', 'field', 'old_value', 'new_value', 'actor', 'created_at']
+    list_filter = ['field', 'created_at']
+    raw_id_fields = ['task', 'actor']
+    readonly_fields = ['created_at']
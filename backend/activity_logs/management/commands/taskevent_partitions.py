@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from activity_logs.partitions import add_months, detach_partitions_before, ensure_partitions, month_start
+
+
+class Command(BaseCommand):
+    help = "Create upcoming monthly TaskEvent partitions and detach old ones (PostgreSQL only)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=3,
+            help="Make sure partitions exist for this many months starting with the current one",
+        )
+        parser.add_argument(
+            "--retain-months", type=int, default=None,
+            help="Detach partitions older than this many months before the current one",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write("TaskEvent is only partitioned on PostgreSQL; nothing to do.")
+            return
+        if options["months_ahead"] < 1:
+            raise CommandError("--months-ahead must be at least 1")
+
+        this_month = month_start(timezone.now().date())
+        for name in ensure_partitions(connection, this_month, options["months_ahead"]):
+            self.stdout.write(f"Created partition {name}")
+
+        if options["retain_months"] is not None:
+            cutoff = add_months(this_month, -options["retain_months"])
+            for name in detach_partitions_before(connection, cutoff):
+                self.stdout.write(f"Detached partition {name} (drop or archive it at leisure)")
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity_logs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(
+                fields=["-updated_at", "id"], name="activitylog_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:19
+# On PostgreSQL the table is created range partitioned by month instead.
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+from django.utils import timezone
+
+
+def create_taskevent_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        from activity_logs.partitions import create_partitioned_table, ensure_partitions
+
+        create_partitioned_table(schema_editor)
+        ensure_partitions(schema_editor.connection, timezone.now().date(), 3)
+    else:
+        schema_editor.create_model(apps.get_model("activity_logs", "TaskEvent"))
+
+
+def drop_taskevent_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("activity_logs", "TaskEvent"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("activity_logs", "0002_activitylog_updated_idx"),
+    ]
+
+    state_operations = [
+        migrations.CreateModel(
+            name="TaskEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("field", models.CharField(max_length=50)),
+                ("old_value", models.TextField(blank=True, null=True)),
+                ("new_value", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "actor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="task_events",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="tasks.task",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["task", "-created_at", "-id"],
+                        name="taskevent_task_timeline_idx",
+                    )
+                ],
+            },
+        ),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=state_operations),
+        migrations.RunPython(create_taskevent_table, drop_taskevent_table),
+    ]
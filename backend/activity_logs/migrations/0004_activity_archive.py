@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activity_logs", "0003_taskevent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityLogArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("task_id", models.BigIntegerField(unique=True)),
+                ("previous_assignee_id", models.BigIntegerField(null=True)),
+                ("previous_status", models.CharField(blank=True, max_length=20)),
+                ("previous_due_date", models.DateTimeField(null=True)),
+                ("updated_at", models.DateTimeField()),
+                ("updated_by_id", models.BigIntegerField(null=True)),
+                ("archived_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TaskEventArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("task_id", models.BigIntegerField()),
+                ("field", models.CharField(max_length=50)),
+                ("old_value", models.TextField(null=True)),
+                ("new_value", models.TextField(null=True)),
+                ("actor_id", models.BigIntegerField(null=True)),
+                ("created_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["task_id"], name="taskeventarchive_task_idx")
+                ],
+            },
+        ),
+    ]
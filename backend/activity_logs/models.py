@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from tasks.models import Task
 
 class ActivityLog(models.Model):
@@ -23,6 +24,72 @@ class ActivityLog(models.Model):
     
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['-updated_at', 'id'], name='activitylog_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Activity log for {self.task.title}"
+
+
+class TaskEvent(models.Model):
+    """
+    One append-only row per changed field. On PostgreSQL the table is range
+    partitioned by month on created_at (see activity_logs.partitions).
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='events')
+    field = models.CharField(max_length=50)
+    old_value = models.TextField(null=True, blank=True)
+    new_value = models.TextField(null=True, blank=True)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='task_events'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['task', '-created_at', '-id'], name='taskevent_task_timeline_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.field} changed on task {self.task_id}"
+
+
+class ActivityLogArchive(models.Model):
+    """The ActivityLog of an archived task (see tasks.archive)"""
+    id = models.BigIntegerField(primary_key=True)
+    task_id = models.BigIntegerField(unique=True)
+    previous_assignee_id = models.BigIntegerField(null=True)
+    previous_status = models.CharField(max_length=20, blank=True)
+    previous_due_date = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField()
+    updated_by_id = models.BigIntegerField(null=True)
+    archived_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Archived activity log for task {self.task_id}"
+
+
+class TaskEventArchive(models.Model):
+    """The TaskEvents of an archived task (see tasks.archive)"""
+    id = models.BigIntegerField(primary_key=True)
+    task_id = models.BigIntegerField()
+    field = models.CharField(max_length=50)
+    old_value = models.TextField(null=True)
+    new_value = models.TextField(null=True)
+    actor_id = models.BigIntegerField(null=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_id'], name='taskeventarchive_task_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Archived {self.field} change on task {self.task_id}"
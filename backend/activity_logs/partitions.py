@@ -0,0 +1,97 @@
+"""
+Monthly range partitions for the TaskEvent table on PostgreSQL.
+
+Rows land in ``activity_logs_taskevent_pYYYYMM`` by created_at, with a
+DEFAULT partition as a safety net. Old months are removed with
+``DETACH PARTITION``, which is a catalog change instead of a bulk DELETE.
+"""
+from datetime import date
+
+TABLE = 'activity_logs_taskevent'
+
+CREATE_PARTITIONED_TABLE = f"""
+CREATE TABLE {TABLE} (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    task_id bigint NOT NULL REFERENCES tasks_task (id) DEFERRABLE INITIALLY DEFERRED,
+    field varchar(50) NOT NULL,
+    old_value text NULL,
+    new_value text NULL,
+    actor_id bigint NULL REFERENCES accounts_user (id) DEFERRABLE INITIALLY DEFERRED,
+    created_at timestamp with time zone NOT NULL,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at)
+"""
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y%m}'
+
+
+def create_partitioned_table(schema_editor):
+    schema_editor.execute(CREATE_PARTITIONED_TABLE)
+    schema_editor.execute(
+        f'CREATE INDEX taskevent_task_timeline_idx ON {TABLE} (task_id, created_at DESC, id DESC)'
+    )
+    schema_editor.execute(f'CREATE INDEX taskevent_actor_idx ON {TABLE} (actor_id)')
+    schema_editor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+
+
+def ensure_partitions(connection, first_month, count):
+    """Create the monthly partitions starting at ``first_month``; returns the new names"""
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(count):
+            month = add_months(month_start(first_month), offset)
+            name = partition_name(month)
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is not None:
+                continue
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+            created.append(name)
+    return created
+
+
+def attached_partitions(connection):
+    """(month, name) for every attached monthly partition, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f'{TABLE}_p'
+    partitions = []
+    for name in names:
+        if name.startswith(prefix):
+            stamp = name[len(prefix):]
+            partitions.append((date(int(stamp[:4]), int(stamp[4:]), 1), name))
+    return sorted(partitions)
+
+
+def detach_partitions_before(connection, month):
+    """Detach monthly partitions that end on or before ``month``; returns their names"""
+    detached = []
+    with connection.cursor() as cursor:
+        for partition_month, name in attached_partitions(connection):
+            if partition_month < month_start(month):
+                cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+                detached.append(name)
+    return detached
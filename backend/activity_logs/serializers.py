@@ -1,12 +1,15 @@
 from rest_framework import serializers
-from .models import ActivityLog
+from task_tracker.fieldsets import ExpandableFieldsMixin
+from .models import ActivityLog, TaskEvent
 from tasks.serializers import TaskSerializer
 from accounts.serializers import UserSerializer
 
-class ActivityLogSerializer(serializers.ModelSerializer):
-    task = TaskSerializer(read_only=True)
-    previous_assignee = UserSerializer(read_only=True)
-    updated_by = UserSerializer(read_only=True)
+class ActivityLogSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'task': TaskSerializer,
+        'previous_assignee': UserSerializer,
+        'updated_by': UserSerializer,
+    }
     
     class Meta:
         model = ActivityLog
@@ -14,3 +17,10 @@ class ActivityLogSerializer(serializers.ModelSerializer):
             'id', 'task', 'previous_assignee', 'previous_status', 
             'previous_due_date', 'updated_at', 'updated_by'
         ]
+
+class TaskEventSerializer(serializers.ModelSerializer):
+    actor = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = TaskEvent
+        fields = ['id', 'field', 'old_value', 'new_value', 'actor', 'created_at']
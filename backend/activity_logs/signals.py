@@ -1,30 +1,90 @@
-from django.db.models.signals import pre_save
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 from tasks.models import Task
-from .models import ActivityLog
+from tasks.signals import tasks_bulk_updated
+from .models import ActivityLog, TaskEvent
+from .writebehind import get_writer, write_activity
 
 @receiver(pre_save, sender=Task)
-def create_activity_log(sender, instance, **kwargs):
-    if instance.pk:  # Only for updates, not creation
-        try:
-            old_task = Task.objects.get(pk=instance.pk)
-            
-            # Get or create activity log for this task
-            activity_log, created = ActivityLog.objects.get_or_create(
-                task=instance,
-                defaults={
-                    'previous_assignee': old_task.assigned_to,
-                    'previous_status': old_task.status,
-                    'previous_due_date': old_task.due_date,
-                }
-            )
-            
-            # Update the activity log with previous values
-            if not created:
-                activity_log.previous_assignee = old_task.assigned_to
-                activity_log.previous_status = old_task.status
-                activity_log.previous_due_date = old_task.due_date
-                activity_log.save()
-                
-        except Task.DoesNotExist:
-            pass
+def collect_tracked_changes(sender, instance, **kwargs):
+    instance._tracked_changes = None
+    if not instance.pk:  # Only for updates, not creation
+        return
+
+    if instance.has_tracked_snapshot():
+        # Compare against the values the task was loaded with
+        if not instance.has_tracked_changes():
+            return
+        previous = {attname: instance.get_loaded_value(attname) for attname in Task.TRACKED_FIELDS}
+    else:
+        # Built in Python, or loaded with some tracked field deferred
+        deferred = instance.get_deferred_fields()
+        if all(attname in deferred for attname in Task.TRACKED_FIELDS):
+            return
+        previous = Task.all_with_deleted.filter(pk=instance.pk).values(*Task.TRACKED_FIELDS).first()
+        if previous is None or all(
+            attname in deferred or getattr(instance, attname) == previous[attname]
+            for attname in Task.TRACKED_FIELDS
+        ):
+            return
+    instance._tracked_changes = previous
+
+@receiver(post_save, sender=Task)
+def create_activity_log(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_tracked_changes', None)
+    instance._tracked_changes = None
+    if created or previous is None:
+        return
+    record_task_changes([(instance, previous)], getattr(instance, 'changed_by', None))
+
+@receiver(tasks_bulk_updated, sender=Task)
+def create_bulk_activity_logs(sender, changes, actor=None, **kwargs):
+    record_task_changes(changes, actor)
+
+def record_task_changes(changes, actor=None):
+    """Write activity logs and history events for saved updates, given (task, previous values) pairs"""
+    if not changes:
+        return
+    actor_id = actor.pk if actor is not None else None
+    logs = [
+        ActivityLog(
+            task_id=task.pk,
+            previous_assignee_id=previous['assigned_to_id'],
+            previous_status=previous['status'],
+            previous_due_date=previous['due_date'],
+            updated_by_id=actor_id,
+        )
+        for task, previous in changes
+    ]
+    events = [event for task, previous in changes for event in build_task_events(task, previous, actor_id)]
+
+    if settings.ACTIVITY_LOG_WRITE_BEHIND:
+        # Queued once the surrounding transaction commits, written in the background
+        transaction.on_commit(lambda: get_writer().submit(logs, events))
+    else:
+        write_activity(logs, events)
+
+def build_task_events(task, previous, actor_id=None):
+    """One TaskEvent per tracked field that differs from ``previous``"""
+    events = []
+    for attname in Task.TRACKED_FIELDS:
+        old, new = previous[attname], getattr(task, attname)
+        if old == new:
+            continue
+        events.append(TaskEvent(
+            task_id=task.pk,
+            field=task._meta.get_field(attname).name,
+            old_value=_as_text(old),
+            new_value=_as_text(new),
+            actor_id=actor_id,
+        ))
+    return events
+
+def _as_text(value):
+    if value is None:
+        return None
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
@@ -1,6 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    activity_log_list_view = views.AsyncActivityLogListView
+else:
+    activity_log_list_view = views.ActivityLogListView
+
 urlpatterns = [
-    path('', views.ActivityLogListView.as_view(), name='activity-log-list'),
+    path('', activity_log_list_view.as_view(), name='activity-log-list'),
+    path('queue/', views.activity_log_queue, name='activity-log-queue'),
 ]
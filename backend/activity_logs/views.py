@@ -1,19 +1,59 @@
 from rest_framework import generics, permissions
+from django.conf import settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import ActivityLog
-from .serializers import ActivityLogSerializer
+from rest_framework.filters import OrderingFilter
+from task_tracker.asyncviews import AsyncAPIView, AsyncListModelMixin
+from task_tracker.fieldsets import SparseFieldsetMixin
+from task_tracker.pagination import KeysetPagination
+from task_tracker.search import FullTextSearchFilter
+from tasks.models import Task
+from tasks.views import TaskPermission
+from .models import ActivityLog, TaskEvent
+from .serializers import ActivityLogSerializer, TaskEventSerializer
+from .writebehind import get_writer
 
 class IsAdminPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_admin
 
-class ActivityLogListView(generics.ListAPIView):
-    queryset = ActivityLog.objects.all()
+class ActivityLogPagination(KeysetPagination):
+    ordering = ('-updated_at', 'id')
+
+class ActivityLogListView(SparseFieldsetMixin, generics.ListAPIView):
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAdminPermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = ActivityLogPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['task__project', 'task__status', 'previous_status']
     search_fields = ['task__title', 'task__description']
     ordering_fields = ['updated_at']
     ordering = ['-updated_at']
+    
+    def get_queryset(self):
+        return self.trim_queryset(ActivityLog.objects.all())
+
+class AsyncActivityLogListView(AsyncAPIView, ActivityLogListView, AsyncListModelMixin):
+    pass
+
+class TaskEventPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+class TaskHistoryView(generics.ListAPIView):
+    """Timeline of field changes for one task, newest first"""
+    serializer_class = TaskEventSerializer
+    permission_classes = [TaskPermission]
+    pagination_class = TaskEventPagination
+    
+    def get_queryset(self):
+        tasks = Task.objects.visible_to(self.request.user)
+        task = get_object_or_404(tasks.only('id'), pk=self.kwargs['pk'])
+        return TaskEvent.objects.filter(task=task).select_related('actor')
+
+@api_view(['GET'])
+@permission_classes([IsAdminPermission])
+def activity_log_queue(request):
+    """Write-behind queue depth and counters for this worker process"""
+    return Response({'write_behind': settings.ACTIVITY_LOG_WRITE_BEHIND, **get_writer().stats()})
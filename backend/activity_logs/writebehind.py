@@ -0,0 +1,170 @@
+"""
+Optional write-behind mode for activity logging.
+
+With ``ACTIVITY_LOG_WRITE_BEHIND`` on, task updates hand their ActivityLog and
+TaskEvent rows to a bounded in-process queue once the request transaction
+commits. A background thread drains it in batches, so the request never
+waits on the logging writes. When the queue is full the caller waits up to
+``ACTIVITY_LOG_ENQUEUE_TIMEOUT`` and then writes the batch itself, which
+keeps memory bounded and applies backpressure instead of dropping logs.
+Whatever is still queued at interpreter exit is flushed.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .models import ActivityLog, TaskEvent
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def write_activity(logs, events):
+    """Upsert activity logs and append history events in one transaction"""
+    # A task may appear more than once in a batch; its latest log wins
+    latest_logs = list({log.task_id: log for log in logs}.values())
+    with transaction.atomic():
+        ActivityLog.objects.bulk_create(
+            latest_logs,
+            update_conflicts=True,
+            unique_fields=['task'],
+            update_fields=['previous_assignee', 'previous_status', 'previous_due_date', 'updated_at', 'updated_by'],
+        )
+        TaskEvent.objects.bulk_create(events)
+
+
+class ActivityLogWriter:
+    def __init__(self, max_size, batch_size, flush_interval, enqueue_timeout):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._lock = threading.Lock()
+        # Request threads and the writer thread both update the counters
+        self._counters_lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._queue = None
+        self.enqueued = 0
+        self.written = 0
+        self.overflowed = 0
+        self.failed = 0
+
+    def submit(self, logs, events):
+        self._ensure_started()
+        try:
+            self._queue.put((logs, events), timeout=self.enqueue_timeout)
+        except queue.Full:
+            # Backpressure: the caller pays for this batch synchronously
+            self._count('overflowed')
+            write_activity(logs, events)
+            return
+        self._count('enqueued')
+
+    def _count(self, name, amount=1):
+        with self._counters_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self):
+        with self._counters_lock:
+            return {
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'queue_capacity': self.max_size,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'overflowed': self.overflowed,
+                'failed': self.failed,
+            }
+
+    def stop(self, timeout=10):
+        """Flush everything still queued and stop the worker thread"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Forked workers (gunicorn --preload) must not share the parent's thread
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.max_size)
+            self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                stopping = True
+            self._flush(batch)
+        # Anything submitted while stopping
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        self._flush(remaining)
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        close_old_connections()
+        logs = [log for batch_logs, _events in batch for log in batch_logs]
+        events = [event for _logs, batch_events in batch for event in batch_events]
+        try:
+            write_activity(logs, events)
+        except Exception:
+            if len(batch) == 1:
+                self._count('failed')
+                logger.exception("Failed to write a queued activity log batch")
+                return
+            # One bad submission (e.g. its task was archived or its actor
+            # deleted since) fails them all: retry each on its own
+            logger.warning("Failed to write %d queued activity log batches together; retrying each", len(batch))
+            for item in batch:
+                self._flush([item])
+        else:
+            self._count('written', len(batch))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityLogWriter(
+                    max_size=settings.ACTIVITY_LOG_QUEUE_SIZE,
+                    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+                    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL,
+                    enqueue_timeout=settings.ACTIVITY_LOG_ENQUEUE_TIMEOUT,
+                )
+                atexit.register(_writer.stop)
+    return _writer
@@ -0,0 +1,25 @@
+"""
+gunicorn reads this file from the working directory. Command line flags
+still apply on top of it.
+
+The hooks keep Prometheus' multiprocess mode (PROMETHEUS_MULTIPROC_DIR,
+see task_tracker.metrics) accurate across worker restarts.
+"""
+import glob
+import os
+
+
+def on_starting(server):
+    # Values left by a previous run would be added to this one's
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
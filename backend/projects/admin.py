@@ -1,9 +1,25 @@
 from django.contrib import admin
-from .models import Project
+from .models import Project, ProjectArchive
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ['title', 'owner', 'created_at', 'is_deleted']
     list_filter = ['is_deleted', 'created_at', 'owner']
     search_fields = ['title', 'description']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'deleted_at']
+    
+    def get_queryset(self, request):
+        # Admins can see and undelete soft-deleted projects
+        return Project.all_with_deleted.all()
+
+@admin.register(ProjectArchive)
+class ProjectArchiveAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'owner_id', 'deleted_at', 'archived_at']
+    list_filter = ['archived_at']
+    search_fields = ['title']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-created_at", "id"],
+                name="project_live_created_idx",
+            ),
+        ),
+    ]
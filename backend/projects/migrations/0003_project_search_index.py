@@ -0,0 +1,16 @@
+from django.db import migrations
+from task_tracker.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("projects", "0002_project_live_indexes"),
+    ]
+
+    operations = [
+        CreateSearchIndex(
+            model_name="project",
+            fields=["title", "description"],
+            name="project_search_idx",
+        ),
+    ]
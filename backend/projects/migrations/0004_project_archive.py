@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:13
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_deleted_at(apps, schema_editor):
+    # The last update of an already deleted project is the best guess of when it happened
+    Project = apps.get_model("projects", "Project")
+    Project.objects.filter(is_deleted=True).update(deleted_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0003_project_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                ("owner_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("deleted_at", models.DateTimeField(null=True)),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-archived_at", "-id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_deleted_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                condition=models.Q(("is_deleted", True)),
+                fields=["deleted_at"],
+                name="project_deleted_at_idx",
+            ),
+        ),
+    ]
@@ -1,5 +1,15 @@
 from django.db import models
 from django.conf import settings
+from task_tracker.softdelete import LiveManager, stamp_deletion
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_tasks_count(self):
+        """Annotate each project with its number of live tasks"""
+        return self.annotate(
+            tasks_count=models.Count('tasks', filter=models.Q(tasks__is_deleted=False))
+        )
+
 
 class Project(models.Model):
     title = models.CharField(max_length=200)
@@ -8,14 +18,47 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    # Live projects only; all_with_deleted includes the soft-deleted ones
+    objects = LiveManager.from_queryset(ProjectQuerySet)()
+    all_with_deleted = ProjectQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], condition=models.Q(is_deleted=False),
+                         name='project_live_created_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True),
+                         name='project_deleted_at_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        stamp_deletion(self)
+        super().save(*args, **kwargs)
+    
     def delete(self, using=None, keep_parents=False):
         """Soft delete"""
         self.is_deleted = True
         self.save()
+
+
+class ProjectArchive(models.Model):
+    """A project moved out of projects_project by ``manage.py archive_deleted``, under its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    owner_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-archived_at', '-id']
+
+    def __str__(self):
+        return f"{self.title} (archived)"
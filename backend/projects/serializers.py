@@ -1,12 +1,15 @@
 from rest_framework import serializers
-from .models import Project
+from task_tracker.fieldsets import ExpandableFieldsMixin
+from .models import Project, ProjectQuerySet
 from accounts.serializers import UserSerializer
 
 
-class ProjectSerializer(serializers.ModelSerializer):
-    owner = UserSerializer(read_only=True)
+class ProjectSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
     tasks_count = serializers.SerializerMethodField()
 
+    expandable_fields = {"owner": UserSerializer}
+    field_annotations = {"tasks_count": ProjectQuerySet.with_tasks_count}
+
     class Meta:
         model = Project
         fields = [
@@ -21,7 +24,11 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def get_tasks_count(self, obj):
-        return obj.tasks.filter(is_deleted=False).count()
+        # Querysets built with with_tasks_count() carry the value already
+        tasks_count = getattr(obj, "tasks_count", None)
+        if tasks_count is not None:
+            return tasks_count
+        return obj.tasks.count()
 
 
 class ProjectCreateSerializer(serializers.ModelSerializer):
@@ -1,7 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    project_list_view = views.AsyncProjectListCreateView
+else:
+    project_list_view = views.ProjectListCreateView
+
 urlpatterns = [
-    path('', views.ProjectListCreateView.as_view(), name='project-list-create'),
+    path('', project_list_view.as_view(), name='project-list-create'),
     path('<int:pk>/', views.ProjectDetailView.as_view(), name='project-detail'),
 ]
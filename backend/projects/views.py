@@ -1,7 +1,13 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from django.db.models import Count, Max, Q
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from task_tracker.asyncviews import AsyncAPIView, AsyncListModelMixin
+from task_tracker.cache import CachedListMixin
+from task_tracker.conditional import ConditionalGetMixin
+from task_tracker.fieldsets import SparseFieldsetMixin
+from task_tracker.search import FullTextSearchFilter
 from .models import Project
 from .serializers import ProjectSerializer, ProjectCreateSerializer
 
@@ -13,15 +19,27 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
-class ProjectListCreateView(generics.ListCreateAPIView):
+# Covers the projects, their owners and the tasks behind tasks_count
+PROJECT_VALIDATOR_AGGREGATES = {
+    "count": Count("id", distinct=True),
+    "updated_at": Max("updated_at"),
+    "owner_updated_at": Max("owner__updated_at"),
+    "tasks_updated_at": Max("tasks__updated_at"),
+    "live_tasks": Count("tasks", filter=Q(tasks__is_deleted=False)),
+}
+
+
+class ProjectListCreateView(CachedListMixin, ConditionalGetMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    validator_aggregates = PROJECT_VALIDATOR_AGGREGATES
+    cache_dependencies = ("project", "task", "user")
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "title"]
     ordering = ["-created_at"]
 
     def get_queryset(self):
-        return Project.objects.filter(is_deleted=False)
+        return self.trim_queryset(Project.objects.all())
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -33,12 +51,17 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         serializer.save(owner=self.request.user)
 
 
-class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AsyncProjectListCreateView(AsyncAPIView, ProjectListCreateView, AsyncListModelMixin):
+    pass
+
+
+class ProjectDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAdminOrReadOnly]
+    validator_aggregates = PROJECT_VALIDATOR_AGGREGATES
     serializer_class = ProjectSerializer
 
     def get_queryset(self):
-        return Project.objects.filter(is_deleted=False)
+        return self.trim_queryset(Project.objects.all())
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Compare the WSGI (gunicorn sync workers) and ASGI (uvicorn) deployments
+under concurrent load on the hot read endpoints.
+
+Starts each server in turn against the database the environment points at,
+logs in once, then has ``--concurrency`` clients issue ``--requests`` GETs
+round-robin over ``--path`` and reports throughput and latency percentiles.
+Both servers run with the same number of processes (``--workers``), so the
+comparison is per process. DEBUG is forced on since the servers are plain
+HTTP (otherwise every request is redirected to HTTPS).
+
+    python scripts/bench_asgi.py
+    python scripts/bench_asgi.py --concurrency 100 --requests 2000 --workers 2
+"""
+import os
+import sys
+import argparse
+import json
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'wsgi': ['gunicorn', 'task_tracker.wsgi:application', '--workers', '{workers}', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['uvicorn', 'task_tracker.asgi:application', '--workers', '{workers}', '--port', '{port}',
+             '--no-access-log'],
+}
+
+
+def start_server(name, port, workers):
+    command = [part.format(port=port, workers=workers) for part in SERVERS[name]]
+    env = dict(os.environ, DEBUG='True')
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    for _attempt in range(100):
+        try:
+            urllib.request.urlopen(f'{base_url}/api/tasks/', timeout=1)
+        except urllib.error.HTTPError:
+            return process, base_url  # 401: up and answering
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f'{name} server did not start')
+
+
+def request(url, method='GET', token=None, body=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers, method=method)
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return response.status, response.read()
+
+
+def login(base_url, username, password):
+    _status, body = request(f'{base_url}/api/auth/login/', 'POST', body={'username': username, 'password': password})
+    return json.loads(body)['access']
+
+
+def run_load(base_url, token, paths, total, concurrency):
+    def timed(index):
+        url = base_url + paths[index % len(paths)]
+        started = time.perf_counter()
+        try:
+            request(url, token=token)
+        except (urllib.error.URLError, OSError):
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+    ok = sorted(latency for latency in latencies if latency is not None)
+    return elapsed, ok, total - len(ok)
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin123')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='endpoint to load (repeatable; default: task, project and activity log lists)')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=1, help='server processes for both deployments')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--only', choices=sorted(SERVERS), help='benchmark just one deployment')
+    args = parser.parse_args()
+    paths = args.paths or ['/api/tasks/', '/api/projects/', '/api/activity-logs/']
+
+    print(f'{args.requests} requests, {args.concurrency} concurrent clients, {args.workers} process(es)')
+    print(f'{"server":<8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for name in [args.only] if args.only else sorted(SERVERS, reverse=True):
+        process, base_url = start_server(name, args.port, args.workers)
+        try:
+            token = login(base_url, args.username, args.password)
+            run_load(base_url, token, paths, min(50, args.requests), args.concurrency)  # warm up
+            elapsed, latencies, errors = run_load(base_url, token, paths, args.requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+        print(
+            f'{name:<8}{len(latencies) / elapsed:>10.1f}'
+            f'{statistics.median(latencies) * 1000 if latencies else float("nan"):>10.1f}'
+            f'{percentile(latencies, 0.95) * 1000:>10.1f}{percentile(latencies, 0.99) * 1000:>10.1f}{errors:>8}'
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
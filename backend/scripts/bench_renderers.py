@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Compare the API renderers and parsers on a page of serialized tasks.
+
+Serializes ``--page-size`` tasks from the database the environment points
+at (repeating them if there are fewer), then times rendering and parsing
+that page with DRF's JSON renderer/parser, the orjson ones and MessagePack,
+and reports the time per page and the encoded size.
+
+    python scripts/bench_renderers.py
+    python scripts/bench_renderers.py --page-size 100 --repeat 500
+"""
+import os
+import sys
+import argparse
+import io
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_tracker.settings')
+    import django
+    django.setup()
+
+
+def load_page(page_size):
+    from itertools import cycle, islice
+    from tasks.models import Task
+    from tasks.serializers import TaskSerializer
+
+    tasks = list(Task.objects.filter(is_deleted=False).with_related()[:page_size])
+    if not tasks:
+        raise SystemExit('No tasks in the database; create some first')
+    page = list(islice(cycle(tasks), page_size))
+    results = TaskSerializer(page, many=True, expand=['project.owner', 'assigned_to']).data
+    return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+
+
+def best_of(function, repeat, number):
+    return min(timeit.repeat(function, repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page-size', type=int, default=100, help='tasks per rendered page')
+    parser.add_argument('--repeat', type=int, default=200, help='timed runs per measurement')
+    parser.add_argument('--rounds', type=int, default=5, help='measurements per format; the best is reported')
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from task_tracker.parsers import MessagePackParser, ORJSONParser
+    from task_tracker.renderers import MessagePackRenderer, ORJSONRenderer
+
+    formats = [
+        ('drf json', JSONRenderer(), JSONParser()),
+        ('orjson', ORJSONRenderer(), ORJSONParser()),
+        ('msgpack', MessagePackRenderer(), MessagePackParser()),
+    ]
+    page = load_page(args.page_size)
+
+    print(f'{args.page_size} tasks per page, best of {args.rounds} x {args.repeat} runs')
+    print(f'{"format":<10}{"render us":>12}{"parse us":>12}{"bytes":>10}{"vs drf":>9}')
+    baseline = None
+    for name, renderer, body_parser in formats:
+        body = renderer.render(page, renderer.media_type, {})
+        render = best_of(lambda: renderer.render(page, renderer.media_type, {}), args.rounds, args.repeat)
+        parse = best_of(lambda: body_parser.parse(io.BytesIO(body), body_parser.media_type, {}), args.rounds, args.repeat)
+        baseline = baseline or render
+        print(f'{name:<10}{render * 1e6:>12.1f}{parse * 1e6:>12.1f}{len(body):>10}{baseline / render:>8.1f}x')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Show the query plans and timings of the hot task/project/activity log queries
+and which of the partial indexes they use.
+
+Runs against whatever database the settings point at, so the same script
+covers SQLite (default) and PostgreSQL (DATABASE_URL=postgres://...).
+
+    python scripts/explain_indexes.py
+    python scripts/explain_indexes.py --seed 50000   # add bench rows first
+"""
+import os
+import sys
+import argparse
+import random
+import time
+import django
+from datetime import timedelta
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_tracker.settings')
+django.setup()
+
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from accounts.models import User
+from projects.models import Project
+from tasks.models import Task
+from activity_logs.models import ActivityLog
+
+INDEX_NAMES = [
+    'task_live_created_idx',
+    'task_live_assignee_created_idx',
+    'task_live_status_due_idx',
+    'task_live_project_status_idx',
+    'project_live_created_idx',
+    'activitylog_updated_idx',
+]
+
+
+def seed(count):
+    """Bulk insert bench users, projects and tasks (about 10% soft-deleted)"""
+    owner, _ = User.objects.get_or_create(username='bench_admin', defaults={'role': 'admin'})
+    users = [
+        User.objects.get_or_create(username=f'bench_user_{i}')[0]
+        for i in range(20)
+    ]
+    projects = Project.objects.bulk_create([
+        Project(title=f'Bench project {i}', description='', owner=owner)
+        for i in range(max(1, count // 1000))
+    ])
+    now = timezone.now()
+    statuses = [value for value, _label in Task.STATUS_CHOICES]
+    batch = []
+    for i in range(count):
+        batch.append(Task(
+            title=f'Bench task {i}',
+            description='',
+            status=random.choice(statuses),
+            due_date=now + timedelta(hours=random.randint(-24 * 30, 24 * 30)),
+            project=random.choice(projects),
+            assigned_to=random.choice(users),
+            is_deleted=random.random() < 0.1,
+        ))
+        if len(batch) == 5000:
+            Task.objects.bulk_create(batch)
+            batch = []
+    Task.objects.bulk_create(batch)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    print(f"Seeded {count} tasks across {len(projects)} projects")
+
+
+def hot_queries():
+    now = timezone.now()
+    contributor = User.objects.filter(role='contributor').first()
+    project = Project.objects.filter(is_deleted=False).first()
+    live_tasks = Task.objects.filter(is_deleted=False)
+    return [
+        ('task list (admin, keyset page)',
+         live_tasks.order_by('-created_at', 'id')[:20]),
+        ('task list (contributor)',
+         live_tasks.filter(assigned_to=contributor).order_by('-created_at')[:20]),
+        ('export: overdue',
+         live_tasks.filter(status__in=['todo', 'in_progress'], due_date__lt=now)),
+        ('export: due soon',
+         live_tasks.filter(status__in=['todo', 'in_progress'], due_date__gte=now,
+                           due_date__lte=now + timedelta(hours=48))),
+        ('project status breakdown',
+         live_tasks.filter(project=project).values('status').annotate(total=Count('id')).order_by()),
+        ('project list',
+         Project.objects.filter(is_deleted=False).order_by('-created_at', 'id')[:20]),
+        ('activity log list',
+         ActivityLog.objects.order_by('-updated_at', 'id')[:20]),
+    ]
+
+
+def timed(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset._chain())
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0, help='insert this many bench tasks first')
+    parser.add_argument('--repeat', type=int, default=20, help='runs per query for the median timing')
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+
+    print(f"Database: {connection.vendor}, live tasks: {Task.objects.filter(is_deleted=False).count()}\n")
+    for label, queryset in hot_queries():
+        plan = queryset.explain()
+        used = [name for name in INDEX_NAMES if name in plan]
+        print(f"== {label}: {timed(queryset, args.repeat):.2f} ms median, "
+              f"indexes used: {', '.join(used) or 'none'}")
+        print(plan)
+        print()
+
+
+if __name__ == '__main__':
+    main()
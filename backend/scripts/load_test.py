@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Load-test a running server endpoint by endpoint.
+
+Logs in once, then for each endpoint has ``--concurrency`` clients issue
+``--requests`` GETs (``--export-requests`` for the export, which streams
+every matching task) and reports throughput, latency percentiles, errors
+and the average response size. Endpoints run one after another, so each
+line measures that endpoint alone. Fill the database first, e.g. with
+``python manage.py generate_data``.
+
+    python scripts/load_test.py
+    python scripts/load_test.py --base-url http://127.0.0.1:8000 --concurrency 50 --requests 1000
+    python scripts/load_test.py --only tasks,projects
+    python scripts/load_test.py --endpoint tasks-page3='/api/tasks/?page=3'
+"""
+import sys
+import argparse
+import statistics
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from bench_asgi import login, percentile, request
+
+ENDPOINTS = {
+    'tasks': '/api/tasks/',
+    'tasks-filtered': '/api/tasks/?status=in_progress&ordering=due_date',
+    'tasks-search': '/api/tasks/?search=billing',
+    'projects': '/api/projects/',
+    'activity-logs': '/api/activity-logs/',
+    'export': '/api/tasks/export/?format=csv',
+}
+
+
+def run_endpoint(url, token, total, concurrency):
+    def timed(_index):
+        started = time.perf_counter()
+        try:
+            _status, body = request(url, token=token)
+        except (urllib.error.URLError, OSError):
+            return None
+        return time.perf_counter() - started, len(body)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = [result for result in executor.map(timed, range(total)) if result is not None]
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for latency, _size in results)
+    size = statistics.mean(size for _latency, size in results) if results else 0
+    return elapsed, latencies, total - len(results), size
+
+
+def parse_endpoint(value):
+    name, separator, path = value.partition('=')
+    if not separator or not path.startswith('/'):
+        raise argparse.ArgumentTypeError('expected NAME=/path/')
+    return name, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--username', default='synthetic_0', help='an admin (generate_data makes <prefix>_0 one)')
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--only', help=f'comma separated endpoints to run (of {", ".join(ENDPOINTS)})')
+    parser.add_argument('--endpoint', action='append', type=parse_endpoint, default=[],
+                        help='add or replace an endpoint, as NAME=/path/ (repeatable)')
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('--export-requests', type=int, default=10, help='requests to the export endpoint')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=20, help='untimed requests per endpoint first')
+    args = parser.parse_args()
+
+    endpoints = dict(ENDPOINTS, **dict(args.endpoint))
+    if args.only:
+        names = [name.strip() for name in args.only.split(',') if name.strip()]
+        unknown = [name for name in names if name not in endpoints]
+        if unknown:
+            parser.error(f'unknown endpoints: {", ".join(unknown)}')
+        endpoints = {name: endpoints[name] for name in names}
+
+    base_url = args.base_url.rstrip('/')
+    token = login(base_url, args.username, args.password)
+    print(f'{base_url}, {args.concurrency} concurrent clients')
+    print(f'{"endpoint":<16}{"requests":>9}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+          f'{"errors":>8}{"avg KB":>9}')
+    for name, path in endpoints.items():
+        total = args.export_requests if name == 'export' else args.requests
+        if args.warmup:
+            run_endpoint(base_url + path, token, min(args.warmup, total), args.concurrency)
+        elapsed, latencies, errors, size = run_endpoint(base_url + path, token, total, args.concurrency)
+        print(
+            f'{name:<16}{total:>9}{len(latencies) / elapsed:>9.1f}'
+            f'{statistics.median(latencies) * 1000 if latencies else float("nan"):>9.1f}'
+            f'{percentile(latencies, 0.95) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}'
+            f'{errors:>8}{size / 1024:>9.1f}'
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
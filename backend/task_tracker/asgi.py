@@ -0,0 +1,6 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_tracker.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+application = get_asgi_application()
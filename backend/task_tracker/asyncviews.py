@@ -0,0 +1,132 @@
+"""
+Async versions of DRF's API views for the read-heavy endpoints.
+
+DRF 3.14 only dispatches synchronously, so ``AsyncAPIView`` provides an
+async ``dispatch``: authentication, permissions and throttling run in a
+thread (they may touch the database), GET handlers run on the event loop
+using the async ORM, and any other handler runs as the regular sync code in
+a thread. Under ASGI these threads are per request, so one process serves
+many slow clients concurrently.
+
+The async list/retrieve mixins go *after* the sync view in the bases, e.g.
+``class View(AsyncAPIView, SyncView, AsyncListModelMixin)``, so that
+ConditionalGetMixin and CachedListMixin wrap them the same way they wrap
+the sync ``list``/``retrieve``.
+"""
+import asyncio
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from rest_framework.response import Response
+
+EXPORT_ITERATOR_BATCH = 64
+
+
+def _in_thread(handler):
+    async def run(self, request, *args, **kwargs):
+        return await sync_to_async(handler)(self, request, *args, **kwargs)
+    run.__name__ = handler.__name__
+    run.__doc__ = handler.__doc__
+    return run
+
+
+class AsyncAPIView:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Django requires every handler of an async view to be async
+        for method in cls.http_method_names:
+            handler = getattr(cls, method, None)
+            if method != 'options' and handler is not None and not asyncio.iscoroutinefunction(handler):
+                setattr(cls, method, _in_thread(handler))
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aget(request, *args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """APIView.dispatch, awaiting the handler"""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if asyncio.iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncGenericMixin:
+    async def afilter_queryset(self, queryset):
+        # Filter backends may validate lookups (e.g. ?project=) against the database
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        apaginate = getattr(self.paginator, 'apaginate_queryset', None)
+        if apaginate is None:
+            return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+        return await apaginate(queryset, self.request, view=self)
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class AsyncListModelMixin(AsyncGenericMixin):
+    async def aget(self, request, *args, **kwargs):
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer([row async for row in queryset], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveModelMixin(AsyncGenericMixin):
+    async def aget(self, request, *args, **kwargs):
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+
+async def aiterate(iterable, batch_size=EXPORT_ITERATOR_BATCH):
+    """
+    Async iterator over a sync one, e.g. a streaming export under ASGI.
+
+    Items are pulled in batches on the request's sync thread, where the
+    iterator's database cursor lives.
+    """
+    iterator = iter(iterable)
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    while True:
+        batch = await next_batch()
+        if not batch:
+            return
+        for item in batch:
+            yield item
@@ -0,0 +1,199 @@
+"""
+Response cache for the read-heavy list endpoints.
+
+Entries are keyed by the view, the user's scope (role, plus the user id for
+contributors since their lists are filtered to them), the host and full
+query string, and the current version of every model the response depends
+on. Saving or soft-deleting a Task, Project or User bumps that model's
+version (the time of the change) once the transaction commits, so stale
+entries simply stop being looked up; ``RESPONSE_CACHE_TIMEOUT`` only bounds
+how long they linger. Responses read from a read replica within
+``DATABASE_REPLICA_STICKINESS`` seconds of a change are not stored, as the
+replica may not have caught up with it yet.
+
+Any Django cache works as the backend (``RESPONSE_CACHE_ALIAS``), but it
+must be shared between worker processes for invalidation to reach them all.
+"""
+import hashlib
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework.response import Response
+from tasks.signals import tasks_bulk_updated
+from .routers import read_from_replica
+
+VERSION_KEY = 'api-response-version:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else None
+    return stats
+
+
+def get_versions(names):
+    cache = get_cache()
+    keys = {name: VERSION_KEY.format(name) for name in names}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        if key not in found:
+            # Seed from the clock so a version evicted from the cache can
+            # never come back with a value that old entries were stored under
+            cache.add(key, time.time_ns())
+            found[key] = cache.get(key)
+        versions[name] = found[key]
+    return versions
+
+
+def bump_version(name):
+    get_cache().set(VERSION_KEY.format(name), time.time_ns(), None)
+    _count('invalidations')
+
+
+def _may_lag(versions):
+    if not read_from_replica():
+        return False
+    changed_at = max(versions.values(), default=0)
+    return time.time_ns() - changed_at < settings.DATABASE_REPLICA_STICKINESS * 1e9
+
+
+def invalidate_on_commit(name):
+    if settings.RESPONSE_CACHE_ENABLED:
+        transaction.on_commit(lambda: bump_version(name))
+
+
+class CachedListMixin:
+    """
+    Serve GET list responses from the response cache.
+
+    ``cache_dependencies`` names the models whose changes invalidate the
+    cached data.
+
+    Listed before ConditionalGetMixin, it also derives the list's ETag from
+    the cache key (so from the model versions) instead of the validator
+    aggregate, and a revalidation or cache hit runs no query at all.
+    Responses that may come from a lagging replica aren't cached, so they
+    fall back to the aggregate.
+    """
+
+    cache_dependencies = ()
+
+    def _get_cache_versions(self):
+        # Shared by the validator and the list within one request
+        versions = getattr(self, '_cache_versions', None)
+        if versions is None:
+            versions = self._cache_versions = get_versions(self.cache_dependencies)
+        return versions
+
+    def _versioned_etag(self, request, versions):
+        raw = f'{self.get_cache_key(request, versions)}|{request.accepted_media_type}'
+        return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+    def get_validators(self, request):
+        if settings.RESPONSE_CACHE_ENABLED:
+            versions = self._get_cache_versions()
+            if not _may_lag(versions):
+                return self._versioned_etag(request, versions)
+        return super().get_validators(request)
+
+    async def aget_validators(self, request):
+        if settings.RESPONSE_CACHE_ENABLED:
+            versions = await sync_to_async(self._get_cache_versions)()
+            if not _may_lag(versions):
+                return self._versioned_etag(request, versions)
+        return await super().aget_validators(request)
+
+    def get_cache_key(self, request, versions):
+        user = request.user
+        scope = f'{user.role}:{user.pk}' if user.is_contributor else user.role
+        raw = '|'.join([
+            type(self).__name__,
+            scope,
+            request.get_host(),
+            request.get_full_path(),
+            *(f'{name}={versions[name]}' for name in self.cache_dependencies),
+        ])
+        return 'api-response:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_cache()
+        versions = self._get_cache_versions()
+        key = self.get_cache_key(request, versions)
+        data = cache.get(key)
+        if data is not None:
+            return self._cached_response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and not _may_lag(versions):
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return self._uncached_response(response)
+
+    async def alist(self, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return await super().alist(request, *args, **kwargs)
+
+        cache = get_cache()
+        versions = await sync_to_async(self._get_cache_versions)()
+        key = self.get_cache_key(request, versions)
+        data = await cache.aget(key)
+        if data is not None:
+            return self._cached_response(data)
+
+        response = await super().alist(request, *args, **kwargs)
+        if response.status_code == 200 and not _may_lag(versions):
+            await cache.aset(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return self._uncached_response(response)
+
+    def _cached_response(self, data):
+        _count('hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    def _uncached_response(self, response):
+        _count('misses')
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+def _invalidate_tasks(sender, **kwargs):
+    invalidate_on_commit('task')
+
+
+def _invalidate_projects(sender, **kwargs):
+    invalidate_on_commit('project')
+
+
+def _invalidate_users(sender, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_on_commit('user')
+
+
+for signal in (post_save, post_delete):
+    signal.connect(_invalidate_tasks, sender='tasks.Task', dispatch_uid='response-cache-task')
+    signal.connect(_invalidate_projects, sender='projects.Project', dispatch_uid='response-cache-project')
+    signal.connect(_invalidate_users, sender=settings.AUTH_USER_MODEL, dispatch_uid='response-cache-user')
+tasks_bulk_updated.connect(_invalidate_tasks, dispatch_uid='response-cache-task-bulk')
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+
+class ConditionalGetMixin:
+    """
+    ETag support for list and detail GETs.
+
+    The validator comes from a single aggregate query over the rows the
+    response would contain (see ``validator_aggregates``: usually the row
+    count plus Max(updated_at) of the rows and of what they nest), salted
+    with the requesting user's scope, the full request path and the
+    negotiated media type (JSON and MessagePack differ). A matching
+    If-None-Match returns 304 before anything is serialized. Responses are
+    marked ``private, no-cache`` so browsers store them and revalidate
+    instead of refetching.
+
+    There is no Last-Modified: Max(updated_at) doesn't move when a row
+    leaves the set (soft delete, reassignment out of a contributor's
+    scope), so If-Modified-Since would answer 304 with stale data.
+    """
+
+    validator_aggregates = {}
+
+    def get_validator_queryset(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in self.kwargs:
+            return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup]})
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validators(self, request):
+        values = self.get_validator_queryset().order_by().aggregate(**self.validator_aggregates)
+        return self._make_validators(request, values)
+
+    async def aget_validators(self, request):
+        # Building the queryset runs the filter backends, which may query
+        queryset = await sync_to_async(self.get_validator_queryset)()
+        values = await queryset.order_by().aaggregate(**self.validator_aggregates)
+        return self._make_validators(request, values)
+
+    def _make_validators(self, request, values):
+        if not values.get('count'):
+            # Let the normal path answer empty lists and 404s
+            return None
+        user = request.user
+        scope = f'{user.role}:{user.pk}' if user.is_contributor else user.role
+        payload = json.dumps(
+            [scope, request.get_full_path(), request.accepted_media_type, sorted(values.items())],
+            default=lambda value: value.isoformat(),
+        )
+        return '"%s"' % hashlib.md5(payload.encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_validators(request)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = super().get(request, *args, **kwargs)
+        return self._finish_response(response, etag)
+
+    async def aget(self, request, *args, **kwargs):
+        etag = await self.aget_validators(request)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        response = await super().aget(request, *args, **kwargs)
+        return self._finish_response(response, etag)
+
+    def _not_modified(self, request, etag):
+        if etag is None:
+            return None
+        not_modified = get_conditional_response(request._request, etag=etag)
+        if not_modified is None:
+            return None
+        return self._add_validator_headers(not_modified, etag)
+
+    def _finish_response(self, response, etag):
+        if etag is not None and response.status_code == 200:
+            self._add_validator_headers(response, etag)
+        return response
+
+    def _add_validator_headers(self, response, etag):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Accept', 'Authorization'])
+        return response
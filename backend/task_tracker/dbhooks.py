@@ -0,0 +1,20 @@
+"""
+Hooks into query execution, shared by the profiling, query stats and
+metrics instrumentation.
+"""
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+def add_execute_wrapper(wrapper, dispatch_uid):
+    """
+    Run ``wrapper`` around every query on every connection: the ones each
+    thread opens from now on, and the ones already open in this one
+    """
+    def add(sender=None, connection=None, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(add, weak=False, dispatch_uid=dispatch_uid)
+    for connection in connections.all(initialized_only=True):
+        add(connection=connection)
@@ -0,0 +1,173 @@
+"""
+A small thread-safe pool of DB-API connections.
+
+Used by the ``task_tracker.postgresql_pool`` database backend, but it knows
+nothing about PostgreSQL: callers pass in how to open, check and reset a
+connection. Connections are handed out most recently used first, so under
+light load the surplus ones sit idle and get closed after ``max_idle``
+seconds, down to ``min_size``. When ``max_size`` connections are in use,
+``acquire`` waits up to ``timeout`` seconds and then raises ``PoolTimeout``.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, min_size=0, max_size=10, max_idle=300.0, timeout=5.0, check_after=30.0):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_after = check_after
+        self._idle = deque()  # (connection, released_at), oldest on the left
+        self._size = 0
+        self._condition = threading.Condition()
+        self.created = 0
+        self.closed = 0
+        self.reaped = 0
+        self.acquired = 0
+        self.waits = 0
+        self.timeouts = 0
+
+    def acquire(self, connect, check=None):
+        """
+        An idle connection, or a new one from ``connect()`` when the pool has
+        room. Connections idle for longer than ``check_after`` seconds are
+        verified with ``check(connection)`` first and replaced if it fails.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, released_at = self._checkout(deadline)
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._forget()
+                    raise
+                with self._condition:
+                    self.created += 1
+                    self.acquired += 1
+                return connection
+            if check is None or time.monotonic() - released_at < self.check_after or check(connection):
+                with self._condition:
+                    self.acquired += 1
+                return connection
+            self._discard(connection)
+
+    def release(self, connection, reset=None):
+        """Return a connection; ``reset(connection)`` returning False discards it instead"""
+        try:
+            usable = reset is None or reset(connection)
+        except Exception:
+            usable = False
+        if not usable:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._reap()
+            self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            idle = [connection for connection, _released_at in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self.closed += len(idle)
+        for connection in idle:
+            _close_quietly(connection)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'created': self.created,
+                'closed': self.closed,
+                'reaped': self.reaped,
+                'acquired': self.acquired,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+            }
+
+    def _checkout(self, deadline):
+        """(idle connection, released_at), or (None, None) after reserving room for a new one"""
+        with self._condition:
+            while True:
+                self._reap()
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f'No database connection available within {self.timeout}s '
+                                      f'({self.max_size} in use)')
+                self.waits += 1
+                self._condition.wait(remaining)
+
+    def _reap(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.max_idle:
+            connection, _released_at = self._idle.popleft()
+            self._size -= 1
+            self.closed += 1
+            self.reaped += 1
+            _close_quietly(connection)
+
+    def _discard(self, connection):
+        _close_quietly(connection)
+        with self._condition:
+            self.closed += 1
+        self._forget()
+
+    def _forget(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options):
+    key = (os.getpid(), alias)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(
+                    min_size=options.get('MIN_SIZE', 0),
+                    max_size=options.get('MAX_SIZE', 10),
+                    max_idle=options.get('MAX_IDLE', 300),
+                    timeout=options.get('TIMEOUT', 5),
+                    check_after=options.get('CHECK_AFTER', 30),
+                )
+    return pool
+
+
+def pool_stats():
+    """Stats of this process's pools, by database alias"""
+    pid = os.getpid()
+    return {alias: pool.stats() for (pool_pid, alias), pool in list(_pools.items()) if pool_pid == pid}
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
@@ -0,0 +1,330 @@
+"""
+Sparse fieldsets (``?fields=``) and opt-in expansion (``?expand=``).
+
+Related objects render as their primary key unless expanded:
+``?expand=project,assigned_to`` nests them, and dotted paths reach further
+down (``?expand=task.project``). ``?fields=id,title,project`` keeps only
+the listed fields; dotted names pick fields of an expanded object
+(``?fields=id,project.title&expand=project``).
+
+The view builds its queryset from the same options
+(``ExpandableFieldsMixin.optimize_queryset``): only the rendered columns
+are loaded, expanded relations are joined (or prefetched when their rows
+need annotating, like a project's ``tasks_count``) and nothing else is.
+
+With ``?format=normalized`` list rows keep the ids, and every expanded
+object (everything reachable, when there's no ``?expand=``) is serialized
+once into ``included``, e.g. ``{"results": [...], "included": {"projects":
+{"1": {...}}, "users": {...}}}``, loaded with one IN query per type.
+"""
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import permissions, serializers
+
+# Bounds ?format=normalized without ?expand= for self-referencing serializers
+MAX_EXPANSION_DEPTH = 3
+
+
+def split_paths(paths):
+    """(own names, {name: [nested paths]}) for paths like ['id', 'project.title']"""
+    own, nested = [], {}
+    for path in paths:
+        name, _dot, rest = path.partition('.')
+        if name not in own:
+            own.append(name)
+        if rest:
+            nested.setdefault(name, []).append(rest)
+    return own, nested
+
+
+def parse_paths(value):
+    return [path.strip() for path in value.split(',') if path.strip()]
+
+
+class _LoadPlan:
+    """What a queryset has to load to render one serializer"""
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = []
+        self.load_all = False
+        self.joins = []
+        self.prefetches = []
+        self.annotations = []
+
+    def get_columns(self):
+        if self.load_all:
+            return [field.name for field in self.model._meta.concrete_fields]
+        return self.columns
+
+    def join(self, relation, nested):
+        self.columns.append(relation)
+        self.columns += [f'{relation}__{column}' for column in nested.get_columns()]
+        self.joins.append(relation)
+        self.joins += [f'{relation}__{path}' for path in nested.joins]
+        self.prefetches += [
+            Prefetch(f'{relation}__{prefetch.prefetch_through}', queryset=prefetch.queryset)
+            for prefetch in nested.prefetches
+        ]
+
+    def prefetch(self, relation, nested):
+        self.columns.append(relation)
+        self.prefetches.append(Prefetch(relation, queryset=nested.apply(nested.model._base_manager.all())))
+
+    def apply(self, queryset, required=()):
+        for annotate in self.annotations:
+            queryset = annotate(queryset)
+        if self.joins:
+            queryset = queryset.select_related(*self.joins)
+        if self.prefetches:
+            queryset = queryset.prefetch_related(*self.prefetches)
+        if not self.load_all:
+            queryset = queryset.only(*self.columns, *required)
+        return queryset
+
+
+class ExpandableFieldsMixin:
+    """
+    ModelSerializer whose related objects render as ids unless expanded.
+
+    ``expandable_fields`` maps a field name to the serializer used when it
+    is expanded. ``field_annotations`` maps fields computed from a queryset
+    annotation to the QuerySet method that adds it, so the annotation is
+    only added when the field is rendered.
+    """
+
+    expandable_fields = {}
+    field_annotations = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        self.requested_fields = fields
+        self.requested_expansions = expand or ()
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand, nested_expand = split_paths(self.requested_expansions)
+        if self.requested_fields is None:
+            selected, nested_fields = None, {}
+        else:
+            selected, nested_fields = split_paths(self.requested_fields)
+
+        for name, serializer_class in self.expandable_fields.items():
+            if name not in fields:
+                continue
+            if (name in expand or name in nested_expand) and issubclass(serializer_class, ExpandableFieldsMixin):
+                fields[name] = serializer_class(
+                    read_only=True, fields=nested_fields.get(name), expand=nested_expand.get(name)
+                )
+            elif name in expand:
+                fields[name] = serializer_class(read_only=True)
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+        if selected is not None:
+            fields = {name: field for name, field in fields.items() if name in selected}
+        return fields
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=(), required=()):
+        """
+        ``queryset`` loading what this serializer renders with these options,
+        plus the ``required`` fields (e.g. the ones a paginator orders by).
+        """
+        plan = _load_plan(cls(fields=fields, expand=expand), queryset.model)
+        return plan.apply(queryset, required)
+
+
+def _load_plan(serializer, model):
+    plan = _LoadPlan(model)
+    field_annotations = getattr(serializer, 'field_annotations', {})
+    for name, field in serializer.fields.items():
+        if name in field_annotations:
+            plan.annotations.append(field_annotations[name])
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            model_field = None
+        if model_field is None or not model_field.concrete:
+            # Can't tell which columns it reads
+            plan.load_all = True
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = _load_plan(field, model_field.related_model)
+            if nested.annotations:
+                # Annotations can't be added to a joined table
+                plan.prefetch(field.source, nested)
+            else:
+                plan.join(field.source, nested)
+        else:
+            plan.columns.append(field.source)
+    return plan
+
+
+def expandable_paths(serializer_class, depth=MAX_EXPANSION_DEPTH):
+    """Every ?expand= path the serializer supports, e.g. ['project', 'project.owner', 'assigned_to']"""
+    paths = []
+    for name, target in getattr(serializer_class, 'expandable_fields', {}).items():
+        paths.append(name)
+        if depth > 1:
+            paths += [f'{name}.{path}' for path in expandable_paths(target, depth - 1)]
+    return paths
+
+
+def _included_name(serializer_class):
+    return str(serializer_class.Meta.model._meta.verbose_name_plural).replace(' ', '_')
+
+
+def sideload(serializer_class, rows, paths):
+    """
+    The ``included`` map for serialized ``rows``: every object the
+    expansion ``paths`` reach, serialized once with its relations as ids.
+    """
+    # Which relations to follow on each included type, and which types
+    # refer to which, so each type is loaded after everything that refers to it
+    followed = defaultdict(set)
+    serializers_by_name = {}
+    refers_to = defaultdict(set)
+
+    def collect(source_name, source_class, source_paths):
+        own, nested = split_paths(source_paths)
+        for field_name in own:
+            target = getattr(source_class, 'expandable_fields', {}).get(field_name)
+            if target is None:
+                continue
+            name = _included_name(target)
+            serializers_by_name[name] = target
+            followed[source_name].add((field_name, name))
+            refers_to[source_name].add(name)
+            collect(name, target, nested.get(field_name, []))
+
+    collect(None, serializer_class, paths)
+
+    pending = defaultdict(set)
+
+    def reference(source_name, items):
+        for item in items:
+            for field_name, name in followed[source_name]:
+                value = item.get(field_name)
+                if value is not None:
+                    pending[name].add(value)
+
+    reference(None, rows)
+    included = {}
+    for name in _load_order(serializers_by_name, refers_to):
+        target = serializers_by_name[name]
+        model = target.Meta.model
+        pk_name = model._meta.pk.name
+        loaded = included.setdefault(name, {})
+        ids = pending.pop(name, set()) - {item[pk_name] for item in loaded.values()}
+        if not ids:
+            continue
+        queryset = model._base_manager.filter(pk__in=ids)
+        if issubclass(target, ExpandableFieldsMixin):
+            queryset = target.optimize_queryset(queryset)
+        items = target(queryset, many=True).data
+        reference(name, items)
+        # String keys: JSON objects (and strict MessagePack readers) need them
+        loaded.update((str(item[pk_name]), item) for item in items)
+    return included
+
+
+def _load_order(names, refers_to):
+    """Types ordered so that each comes after every type that refers to it"""
+    remaining = set(names)
+    order = []
+    while remaining:
+        ready = sorted(
+            name for name in remaining
+            if not any(name in refers_to[other] for other in remaining if other != name)
+        ) or sorted(remaining)  # a cycle: some type will take a second query
+        for name in ready:
+            order.append(name)
+            remaining.discard(name)
+    return order
+
+
+class SparseFieldsetMixin:
+    """
+    Pass ``?fields=`` and ``?expand=`` to the view's serializer and trim the
+    queryset to match, for serializers using ExpandableFieldsMixin.
+
+    The queryset always loads ``required_fields`` and the fields the view
+    may order by, which pagination reads back from the rows. For
+    ``?format=normalized`` list responses the rows are not expanded and the
+    expanded objects are added as ``included`` instead; views list the
+    mixin after CachedListMixin so that is cached with the rows.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+    normalized_format = 'normalized'
+    required_fields = ()
+
+    def is_normalized(self):
+        if (self.lookup_url_kwarg or self.lookup_field) in self.kwargs:
+            # Single objects render as usual
+            return False
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return renderer is not None and renderer.format == self.normalized_format
+
+    def get_fieldset(self):
+        """(fields, expand) for the serializer rendering the rows"""
+        params = self.request.query_params
+        fields = params.get(self.fields_query_param)
+        fields = parse_paths(fields) if fields is not None else None
+        if self.is_normalized():
+            return fields, []
+        return fields, parse_paths(params.get(self.expand_query_param, ''))
+
+    def get_sideload_paths(self):
+        expand = parse_paths(self.request.query_params.get(self.expand_query_param, ''))
+        return expand or expandable_paths(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if self.is_normalized():
+            self.add_included(response)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        response = await super().alist(request, *args, **kwargs)
+        if self.is_normalized():
+            await sync_to_async(self.add_included)(response)
+        return response
+
+    def add_included(self, response):
+        if response.status_code != 200 or not isinstance(response.data, dict) or 'results' not in response.data:
+            return
+        response.data['included'] = sideload(
+            self.get_serializer_class(), response.data['results'], self.get_sideload_paths()
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), ExpandableFieldsMixin):
+            fields, expand = self.get_fieldset()
+            kwargs.setdefault('fields', fields)
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def trim_queryset(self, queryset):
+        serializer_class = self.get_serializer_class()
+        if self.request.method not in permissions.SAFE_METHODS or not issubclass(
+            serializer_class, ExpandableFieldsMixin
+        ):
+            return queryset
+        fields, expand = self.get_fieldset()
+        return serializer_class.optimize_queryset(
+            queryset, fields, expand, required=self.get_required_fields(queryset.model)
+        )
+
+    def get_required_fields(self, model):
+        names = set(self.required_fields)
+        for ordering in (getattr(self, 'ordering', None), getattr(self, 'ordering_fields', None),
+                         getattr(self.pagination_class, 'ordering', None)):
+            if isinstance(ordering, (list, tuple)):
+                names.update(name.lstrip('-') for name in ordering)
+        concrete = {field.name for field in model._meta.concrete_fields}
+        return sorted(names & concrete)
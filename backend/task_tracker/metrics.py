@@ -0,0 +1,124 @@
+"""
+Prometheus metrics, switched on with ``METRICS_ENABLED`` and served at ``/metrics``.
+
+``MetricsMiddleware`` records for every request, labelled with the URL
+name (``task-list-create``, ``export-tasks``, ..., ``unresolved`` for
+404s and static files) and the method:
+
+* ``http_requests_total`` (plus ``status``) and the
+  ``http_request_duration_seconds`` histogram; for streamed responses
+  (the export) the duration ends when the body starts;
+* ``http_requests_in_progress``, by method only since the URL name isn't
+  known until the request is routed;
+* ``db_queries_total`` and ``db_query_duration_seconds_total``;
+* ``response_cache_requests_total`` by ``result`` (hit or miss), taken from
+  the ``X-Cache`` header of the cached lists, so the hit ratio is
+  ``rate(...{result="hit"}) / rate(...)``.
+
+Recording takes no locks of its own: queries are counted on the request's
+own state and added to the counters once per request, and the labelled
+children are looked up in a plain dict after their first use.
+
+Under gunicorn with several workers, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory: every worker then writes its values to memory-mapped
+files there and ``/metrics`` adds up all of them, whichever worker serves
+the scrape. gunicorn.conf.py clears the directory on start and drops the
+in-progress gauges of workers that exit.
+"""
+import contextvars
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from .dbhooks import add_execute_wrapper
+
+METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+UNRESOLVED = 'unresolved'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUESTS = Counter('http_requests_total', 'Requests answered', ['view', 'method', 'status'])
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce the response', ['view', 'method'], buckets=LATENCY_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests being handled', ['method'], multiprocess_mode='livesum'
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL queries run by requests', ['view'])
+DB_TIME = Counter('db_query_duration_seconds_total', 'Time requests spent in SQL queries', ['view'])
+CACHE_REQUESTS = Counter('response_cache_requests_total', 'Response cache lookups', ['view', 'result'])
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+_children = {}
+_installed = False
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+class RequestMetrics:
+    def __init__(self, method):
+        self.method = method if method in METHODS else 'other'
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+
+
+def _count_query(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.queries += 1
+        current.sql_time += time.perf_counter() - started
+
+
+def install():
+    """Count the queries requests run; done once, when metrics are enabled"""
+    global _installed
+    if not _installed:
+        _installed = True
+        add_execute_wrapper(_count_query, 'metrics-queries')
+
+
+def start_request(request):
+    current = RequestMetrics(request.method)
+    _child(IN_PROGRESS, current.method).inc()
+    return current, _current.set(current)
+
+
+def finish_request(current, reset_token):
+    _current.reset(reset_token)
+    _child(IN_PROGRESS, current.method).dec()
+
+
+def record(request, response, current):
+    duration = time.perf_counter() - current.started
+    match = request.resolver_match
+    view = match.view_name if match is not None else UNRESOLVED
+    _child(REQUESTS, view, current.method, str(response.status_code)).inc()
+    _child(LATENCY, view, current.method).observe(duration)
+    if current.queries:
+        _child(DB_QUERIES, view).inc(current.queries)
+        _child(DB_TIME, view).inc(current.sql_time)
+    cache_result = response.get('X-Cache')
+    if cache_result in ('HIT', 'MISS'):
+        _child(CACHE_REQUESTS, view, cache_result.lower()).inc()
+
+
+def render():
+    """(body, content type) of the metrics of this process, or of all workers in multiprocess mode"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
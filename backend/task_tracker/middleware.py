@@ -0,0 +1,201 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+from . import metrics, profiling, querystats, routers
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI, so the middleware chain
+    doesn't hop to a thread for every API request just to miss the static
+    file lookup.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Scope read-replica routing (see task_tracker.routers) to each request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        reset_token = routers.start_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.finish_request(request, reset_token)
+
+    async def __acall__(self, request):
+        reset_token = await routers.astart_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            await routers.afinish_request(request, reset_token)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Base for middleware that wraps each request in the hooks of an
+    instrumentation module, natively in both sync and async mode.
+
+    Subclasses name the setting that switches them on and implement
+    ``install()``, ``start(request)`` (its return value is handed to the
+    other hooks), ``finish(state)`` and optionally ``report(request,
+    response, state)``, which runs once the response is complete. A
+    ``process_view`` they define is also run without a thread hop in async
+    mode, so it must not block.
+    """
+
+    sync_capable = True
+    async_capable = True
+    enabled_setting = None
+
+    def __init__(self, get_response):
+        if not getattr(settings, self.enabled_setting):
+            raise MiddlewareNotUsed
+        self.install()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            if hasattr(self, 'process_view'):
+                # Django would otherwise run the sync hook in a thread
+                process_view = self.process_view
+
+                async def aprocess_view(request, view_func, view_args, view_kwargs):
+                    return process_view(request, view_func, view_args, view_kwargs)
+
+                self.process_view = aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(state)
+        self.report(request, response, state)
+        return response
+
+    async def __acall__(self, request):
+        state = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(state)
+        self.report(request, response, state)
+        return response
+
+    def install(self):
+        pass
+
+    def start(self, request):
+        raise NotImplementedError
+
+    def finish(self, state):
+        raise NotImplementedError
+
+    def report(self, request, response, state):
+        pass
+
+
+class ProfilingMiddleware(RequestInstrumentationMiddleware):
+    """
+    Time sampled requests and report the breakdown in a Server-Timing
+    header and the log (see task_tracker.profiling). First in MIDDLEWARE,
+    so the total covers the rest of the stack.
+    """
+
+    enabled_setting = 'PROFILING_ENABLED'
+
+    def install(self):
+        profiling.install()
+
+    def start(self, request):
+        return profiling.start_request()
+
+    def finish(self, state):
+        _profile, reset_token = state
+        profiling.finish_request(reset_token)
+
+    def report(self, request, response, state):
+        profile, _reset_token = state
+        profiling.report(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profiling.view_started()
+
+
+class QueryStatsMiddleware(RequestInstrumentationMiddleware):
+    """Tag the queries each request runs with its URL name (see task_tracker.querystats)"""
+
+    enabled_setting = 'QUERY_STATS_ENABLED'
+
+    def install(self):
+        querystats.install()
+
+    def start(self, request):
+        return querystats.start_request()
+
+    def finish(self, state):
+        querystats.finish_request(state)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        querystats.view_resolved(request)
+
+
+class MetricsMiddleware(RequestInstrumentationMiddleware):
+    """Record request, query and cache metrics for /metrics (see task_tracker.metrics)"""
+
+    enabled_setting = 'METRICS_ENABLED'
+
+    def install(self):
+        # /metrics exposes traffic details, so it is never served unauthenticated
+        if not settings.METRICS_TOKEN:
+            raise ImproperlyConfigured('METRICS_ENABLED needs METRICS_TOKEN, the bearer token scrapers send to /metrics')
+        metrics.install()
+
+    def start(self, request):
+        return metrics.start_request(request)
+
+    def finish(self, state):
+        metrics.finish_request(*state)
+
+    def report(self, request, response, state):
+        current, _reset_token = state
+        metrics.record(request, response, current)
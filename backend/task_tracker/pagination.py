@@ -0,0 +1,190 @@
+import base64
+import json
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework import pagination
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the full ordering key instead of using
+    OFFSET, so every page costs the same and rows inserted while a client is
+    paging never shift or duplicate results.
+
+    The cursor is an opaque token holding the ordering values of the row the
+    page starts after. Clients that don't need the total can pass
+    ``?count=false`` to skip the COUNT(*).
+    """
+
+    ordering = ('-created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset, count_queryset = self.get_page_queryset(queryset, request, view)
+        self.count = count_queryset.count() if count_queryset is not None else None
+        return self._set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_queryset, count_queryset = self.get_page_queryset(queryset, request, view)
+        self.count = await count_queryset.acount() if count_queryset is not None else None
+        return self._set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """(queryset of the page plus one look-ahead row, queryset to count or None)"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [self._resolve_field(queryset, name) for name in self.ordering]
+        self.position, self.reverse = self.decode_cursor(request)
+
+        count_queryset = queryset.order_by() if self.include_count(request) else None
+
+        ordering = [self._flip(name) for name in self.ordering] if self.reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._seek(ordering, self.position))
+        return queryset[:self.page_size + 1], count_queryset
+
+    def _set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        # Follow the ordering OrderingFilter (or a search rank) put on the
+        # queryset, falling back to the paginator's own
+        ordering = [name for name in queryset.query.order_by if isinstance(name, str)]
+        if len(ordering) != len(queryset.query.order_by) or not ordering:
+            ordering = list(self.ordering)
+        # The primary key is the tiebreaker that makes the key unique
+        if not any(name.lstrip('-') in ('id', 'pk') for name in ordering):
+            ordering.append('id')
+        return ordering
+
+    @staticmethod
+    def _resolve_field(queryset, name):
+        """(attribute name, field used to parse cursor values) for an ordering entry"""
+        name = name.lstrip('-')
+        if name in queryset.query.annotations:
+            return name, queryset.query.annotations[name].output_field
+        field = queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+        return field.attname, field
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, 'true').lower() not in ('false', '0', 'no')
+
+    def get_next_link(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self._link(self.last_row, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_row is None:
+            # Stepped past the end; the first page is the only safe way back
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(self.first_row, reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            token = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = token['v']
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for (_attname, field), value in zip(self.fields, values)]
+            return position, bool(token.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse):
+        values = [getattr(row, attname) for attname, _field in self.fields]
+        # Full isoformat keeps microseconds, which the seek needs to be exact
+        token = {'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]}
+        if reverse:
+            token['r'] = 1
+        data = json.dumps(token, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('ascii')).decode('ascii')
+
+    def _link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def _seek(ordering, position):
+        """Rows strictly after ``position`` in ``ordering`` (a row-value comparison)"""
+        condition = Q()
+        equal_so_far = Q()
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f'{field}__{lookup}': value})
+            equal_so_far &= Q(**{field: value})
+        return condition
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """DRF's page number pagination, plus an async path for async views"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
@@ -0,0 +1,59 @@
+"""
+PostgreSQL backend that keeps connections in an in-process pool.
+
+Closing a connection (at the end of every request, since CONN_MAX_AGE is 0
+with this backend) rolls back anything left open and returns it to the pool;
+opening one takes an idle connection before dialing the server. Configure it
+with a ``POOL`` entry in the database settings::
+
+    'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 10, 'MAX_IDLE': 300, 'TIMEOUT': 5, 'CHECK_AFTER': 30}
+
+Each process (and so each forked worker) has its own pool per alias.
+"""
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from task_tracker.dbpool import PoolTimeout, get_pool
+
+
+def _check(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except Exception:
+        return False
+
+
+def _reset(connection):
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        # Normally set while dialing, which pooled connections skip
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            return self.pool.acquire(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), check=_check
+            )
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection, reset=_reset)
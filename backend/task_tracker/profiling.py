@@ -0,0 +1,158 @@
+"""
+Per-request profiling, switched on with ``PROFILING_ENABLED``.
+
+``ProfilingMiddleware`` measures a sample (``PROFILING_SAMPLE_RATE``) of
+requests: the SQL queries run and the time spent in them, and the time
+spent in the view, in serializing (``Serializer.data``) and in rendering
+the response. The numbers go out in a ``Server-Timing`` header, which
+browser dev tools show with each request, and as a log line on the
+``task_tracker.profiling`` logger tagged with the URL name::
+
+    url=task-list-create method=GET status=200 total_ms=41.2 view_ms=35.0 db_queries=3 db_ms=6.1 serialize_ms=12.4 render_ms=1.9
+
+The view time includes the serializing and the queries the view runs. Work
+done while a streamed body (the export) is sent isn't counted.
+
+Requests slower than ``PROFILING_SLOW_REQUEST_MS`` or running more than
+``PROFILING_SLOW_QUERY_COUNT`` queries are logged as warnings. Requests
+left out of the sample are still timed as a whole, so slow ones are logged
+(without the breakdown) too. When profiling is disabled the middleware
+removes itself and nothing is instrumented.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+from .dbhooks import add_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_installed = False
+
+
+class RequestProfile:
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.phases = {'serialize': 0.0, 'render': 0.0}
+        self._running = set()
+
+    @contextmanager
+    def phase(self, name):
+        if name in self._running:
+            # Nested (e.g. a serializer's data read inside another's): counted by the outer one
+            yield
+            return
+        self._running.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - started
+            self._running.discard(name)
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.sql_time += time.perf_counter() - started
+
+
+def _timed_property(prop, name):
+    def timed(self):
+        profile = _current.get()
+        if profile is None:
+            return prop.fget(self)
+        with profile.phase(name):
+            return prop.fget(self)
+    return property(timed, doc=prop.__doc__)
+
+
+def install():
+    """Instrument query execution, serializing and rendering; done once, when profiling is enabled"""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    add_execute_wrapper(_record_query, 'profiling-queries')
+    # Serializer.data and ListSerializer.data both read BaseSerializer.data
+    serializers.BaseSerializer.data = _timed_property(serializers.BaseSerializer.data, 'serialize')
+    Response.rendered_content = _timed_property(Response.rendered_content, 'render')
+
+
+def start_request():
+    profile = RequestProfile(sampled=random.random() < settings.PROFILING_SAMPLE_RATE)
+    # Only a sampled request is instrumented
+    return profile, _current.set(profile if profile.sampled else None)
+
+
+def view_started():
+    profile = _current.get()
+    if profile is not None:
+        profile.view_started = time.perf_counter()
+
+
+def finish_request(reset_token):
+    _current.reset(reset_token)
+
+
+def report(request, response, profile):
+    """Add the Server-Timing header to the response and log the request"""
+    total = time.perf_counter() - profile.started
+    slow = total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS
+    if not profile.sampled:
+        if slow:
+            _log(logging.WARNING, request, response, {'total_ms': total, 'sampled': False})
+        return
+
+    render = profile.phases['render']
+    view = 0.0
+    if profile.view_started is not None:
+        view = max(0.0, profile.started + total - profile.view_started - render)
+    timings = {
+        'total_ms': total,
+        'view_ms': view,
+        'db_queries': profile.queries,
+        'db_ms': profile.sql_time,
+        'serialize_ms': profile.phases['serialize'],
+        'render_ms': render,
+    }
+    response['Server-Timing'] = ', '.join([
+        f'db;dur={profile.sql_time * 1000:.1f};desc="{profile.queries} queries"',
+        f'view;dur={view * 1000:.1f}',
+        f'serialize;dur={profile.phases["serialize"] * 1000:.1f}',
+        f'render;dur={render * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}',
+    ])
+    slow = slow or profile.queries > settings.PROFILING_SLOW_QUERY_COUNT
+    _log(logging.WARNING if slow else logging.INFO, request, response, timings)
+
+
+def _log(level, request, response, timings):
+    if not logger.isEnabledFor(level):
+        return
+    match = request.resolver_match
+    fields = {
+        'url': match.view_name if match is not None else 'unresolved',
+        'method': request.method,
+        'status': response.status_code,
+        **{
+            name: round(value * 1000, 1) if name.endswith('_ms') else value
+            for name, value in timings.items()
+        },
+    }
+    logger.log(level, ' '.join(f'{name}={value}' for name, value in fields.items()), extra={'profile': fields})
@@ -0,0 +1,217 @@
+"""
+Query fingerprint statistics, switched on with ``QUERY_STATS_ENABLED``.
+
+Every query is reduced to a fingerprint, its SQL with the literals and
+parameters replaced by ``?`` and ``IN``/``VALUES`` lists collapsed, so
+``... WHERE id IN (1, 2, 3) LIMIT 21`` and ``... WHERE id IN (7) LIMIT 21``
+count as the same query. Count, total, max and p95 time (over the last
+``QUERY_STATS_SAMPLES`` runs) are kept per fingerprint and view, the URL
+name of the request that ran it (``-`` outside requests, e.g. the activity
+log writer thread). At most ``QUERY_STATS_MAX_FINGERPRINTS`` of those are
+kept; the least recently seen make room for new ones.
+
+Queries slower than ``QUERY_STATS_SLOW_MS`` are logged on the
+``task_tracker.querystats`` logger, SELECTs with their EXPLAIN plan. The
+SQL is logged with its placeholders and the string literals of the plan
+masked: parameters hold password hashes, emails and tokens, so they are
+only shown with ``QUERY_STATS_LOG_PARAMS``, for debugging.
+
+The numbers are per worker process and are served to admins by
+``/api/query-stats/``.
+"""
+import contextvars
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from .dbhooks import add_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+NO_VIEW = '-'
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_SPACE = re.compile(r'\s+')
+_EXPLAINABLE = re.compile(r'\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+_request_view = contextvars.ContextVar('query_stats_view', default=None)
+_explaining = threading.local()
+_installed = False
+
+
+def fingerprint(sql):
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    sql = _ROWS.sub('(...), ...', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryStats:
+    def __init__(self, fingerprint, view, samples):
+        self.fingerprint = fingerprint
+        self.view = view
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.recent.append(duration)
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, math.ceil(len(recent) * 0.95) - 1)] if recent else 0.0
+        return {
+            'fingerprint': self.fingerprint,
+            'view': self.view,
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'avg_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'p95_ms': round(p95 * 1000, 3),
+        }
+
+
+class QueryStatsCollector:
+    """Bounded map of (fingerprint, view) to QueryStats; the least recently seen are dropped first"""
+
+    def __init__(self, max_entries, samples):
+        self.max_entries = max_entries
+        self.samples = samples
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.started = time.time()
+
+    def add(self, fingerprint, view, duration):
+        key = (fingerprint, view)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = QueryStats(fingerprint, view, self.samples)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._entries.move_to_end(key)
+            entry.add(duration)
+
+    def top(self, limit, order='total_ms'):
+        with self._lock:
+            entries = [entry.as_dict() for entry in self._entries.values()]
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        return entries[:limit]
+
+    def stats(self, limit, order='total_ms'):
+        with self._lock:
+            tracked, evicted = len(self._entries), self.evicted
+        return {
+            'since': self.started,
+            'tracked': tracked,
+            'evicted': evicted,
+            'queries': self.top(limit, order),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self.evicted = 0
+            self.started = time.time()
+
+
+_collector = None
+
+
+def get_collector():
+    global _collector
+    if _collector is None:
+        _collector = QueryStatsCollector(settings.QUERY_STATS_MAX_FINGERPRINTS, settings.QUERY_STATS_SAMPLES)
+    return _collector
+
+
+class RequestView:
+    """The URL name of the current request, filled in once it is resolved"""
+
+    name = NO_VIEW
+
+
+def start_request():
+    return _request_view.set(RequestView())
+
+
+def view_resolved(request):
+    current = _request_view.get()
+    if current is not None and request.resolver_match is not None:
+        current.name = request.resolver_match.view_name
+
+
+def finish_request(reset_token):
+    _request_view.reset(reset_token)
+
+
+def _record_query(execute, sql, params, many, context):
+    if getattr(_explaining, 'active', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - started
+    current = _request_view.get()
+    view = current.name if current is not None else NO_VIEW
+    get_collector().add(fingerprint(sql), view, duration)
+    if duration * 1000 >= settings.QUERY_STATS_SLOW_MS:
+        _log_slow_query(context['connection'], sql, params, many, view, duration)
+    return result
+
+
+def _log_slow_query(connection, sql, params, many, view, duration):
+    plan = None
+    if not many and _EXPLAINABLE.match(sql):
+        plan = _explain(connection, sql, params)
+    if settings.QUERY_STATS_LOG_PARAMS:
+        if params is not None and not many:
+            sql = _interpolate(sql, params)
+    elif plan:
+        # PostgreSQL plans quote the parameter values in their conditions
+        plan = _STRING.sub("'?'", plan)
+    logger.warning('slow query %.1fms view=%s: %s%s', duration * 1000, view, sql, f'\n{plan}' if plan else '')
+
+
+def _explain(connection, sql, params):
+    _explaining.active = True
+    try:
+        # In a savepoint, so a failing EXPLAIN can't break the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f'(no plan: {exc})'
+    finally:
+        _explaining.active = False
+
+
+def _interpolate(sql, params):
+    try:
+        return sql % tuple(repr(param) for param in params)
+    except (TypeError, ValueError):
+        return f'{sql} {params!r}'
+
+
+def install():
+    """Start collecting; done once, when query stats are enabled"""
+    global _installed
+    if not _installed:
+        _installed = True
+        add_execute_wrapper(_record_query, 'query-stats')
@@ -0,0 +1,140 @@
+"""
+Send reads to the read replicas in ``DATABASE_REPLICAS``.
+
+Routing is decided per request by ``ReplicaRoutingMiddleware``: a GET, HEAD
+or OPTIONS request picks the next replica in turn and reads everything from
+it. The primary is used instead
+
+* for writes, and every read that follows a write in the same request;
+* for any request by a user who wrote within the last
+  ``DATABASE_REPLICA_STICKINESS`` seconds, so they read their own writes
+  while the replicas catch up (the user comes from the access token, or is
+  the one the request registered). The window is kept in the default
+  cache, which must be shared by all workers for it to hold across them;
+* outside requests (management commands, background threads).
+"""
+import contextvars
+import itertools
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_save
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_KEY = 'db-primary-pin:{}'
+
+_routing = contextvars.ContextVar('replica_routing', default=None)
+_replica_cycle = None
+
+
+def _next_replica():
+    global _replica_cycle
+    if _replica_cycle is None:
+        _replica_cycle = itertools.cycle(settings.DATABASE_REPLICAS)
+    return next(_replica_cycle)
+
+
+class RequestRouting:
+    def __init__(self, user_id, use_replicas):
+        self.user_id = user_id
+        self.use_replicas = use_replicas
+        self.replica = None
+        self.wrote = False
+
+    def db_for_read(self):
+        if self.wrote or not self.use_replicas:
+            return DEFAULT_DB_ALIAS
+        if self.replica is None:
+            self.replica = _next_replica()
+        return self.replica
+
+
+def read_from_replica():
+    """Whether the current request has read anything from a replica"""
+    routing = _routing.get()
+    return routing is not None and routing.replica is not None
+
+
+def _token_user_id(request):
+    # Imported late: the authentication module loads the User model
+    from accounts.authentication import ClaimsJWTAuthentication
+
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except (AuthenticationFailed, InvalidToken):
+        # Rejected by the view's authentication anyway
+        return None
+
+
+def _pin_key(request, routing):
+    if not routing.wrote:
+        return None
+    user_id = routing.user_id
+    if user_id is None:
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated else None
+    return PIN_KEY.format(user_id) if user_id is not None else None
+
+
+def start_request(request):
+    user_id = _token_user_id(request)
+    pinned = user_id is not None and cache.get(PIN_KEY.format(user_id)) is not None
+    return _routing.set(RequestRouting(user_id, request.method in SAFE_METHODS and not pinned))
+
+
+def finish_request(request, reset_token):
+    routing = _routing.get()
+    _routing.reset(reset_token)
+    key = _pin_key(request, routing)
+    if key is not None:
+        cache.set(key, True, settings.DATABASE_REPLICA_STICKINESS)
+
+
+async def astart_request(request):
+    user_id = _token_user_id(request)
+    pinned = user_id is not None and await cache.aget(PIN_KEY.format(user_id)) is not None
+    return _routing.set(RequestRouting(user_id, request.method in SAFE_METHODS and not pinned))
+
+
+async def afinish_request(request, reset_token):
+    routing = _routing.get()
+    _routing.reset(reset_token)
+    key = _pin_key(request, routing)
+    if key is not None:
+        await cache.aset(key, True, settings.DATABASE_REPLICA_STICKINESS)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return DEFAULT_DB_ALIAS
+        return routing.db_for_read()
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+
+def _remember_registered_user(sender, instance, created, **kwargs):
+    routing = _routing.get()
+    if created and routing is not None and routing.user_id is None:
+        routing.user_id = instance.pk
+
+
+post_save.connect(_remember_registered_user, sender=settings.AUTH_USER_MODEL, dispatch_uid='replica-routing-user')
@@ -0,0 +1,250 @@
+from django.db import connections
+from django.db.migrations.operations.base import Operation
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+# Text search configuration baked into the PostgreSQL GIN indexes
+SEARCH_CONFIG = 'english'
+
+# Models with a full-text index, and the columns it covers
+FULL_TEXT_FIELDS = {
+    'tasks.task': ('title', 'description'),
+    'projects.project': ('title', 'description'),
+}
+
+
+def fts_table(db_table):
+    return f'{db_table}_fts'
+
+
+def _search_vector(fields, prefix=''):
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*[prefix + field for field in fields], config=SEARCH_CONFIG)
+
+
+class CreateSearchIndex(Operation):
+    """
+    Full-text index for a model's text columns: a GIN index over the
+    tsvector on PostgreSQL, or an FTS5 external-content table kept in sync by
+    triggers on SQLite. Other backends are left alone and fall back to the
+    plain icontains search.
+    """
+
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, fields, name):
+        self.model_name = model_name
+        self.fields = list(fields)
+        self.name = name
+
+    def deconstruct(self):
+        return (self.__class__.__name__, [], {
+            'model_name': self.model_name,
+            'fields': self.fields,
+            'name': self.name,
+        })
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            schema_editor.add_index(model, self._gin_index())
+        elif vendor == 'sqlite':
+            install_sqlite_fts(schema_editor, model._meta.db_table, self.fields)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            schema_editor.remove_index(model, self._gin_index())
+        elif vendor == 'sqlite':
+            uninstall_sqlite_fts(schema_editor, model._meta.db_table)
+
+    def describe(self):
+        return f'Create full-text search index {self.name} on {self.model_name}'
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
+
+    def _gin_index(self):
+        from django.contrib.postgres.indexes import GinIndex
+
+        return GinIndex(_search_vector(self.fields), name=self.name)
+
+
+def sqlite_fts5_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def install_sqlite_fts(schema_editor, db_table, fields):
+    """
+    Create the FTS5 shadow table and its sync triggers, then backfill it.
+
+    Idempotent, so migrations that make Django rebuild ``db_table`` (which
+    drops its triggers) can call it again afterwards.
+    """
+    if not sqlite_fts5_available(schema_editor.connection):
+        return
+    fts = fts_table(db_table)
+    columns = ', '.join(fields)
+    new_values = ', '.join(f'new.{field}' for field in fields)
+    old_values = ', '.join(f'old.{field}' for field in fields)
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{db_table}', content_rowid='id')",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {db_table} BEGIN
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {db_table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {db_table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});
+        END""",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_sqlite_fts(schema_editor, db_table):
+    fts = fts_table(db_table)
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {fts}')
+
+
+_installed_fts_tables = set()
+
+
+def _sqlite_fts_installed(connection, table):
+    key = (connection.alias, table)
+    if key not in _installed_fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            if cursor.fetchone() is None:
+                return False
+        _installed_fts_tables.add(key)
+    return True
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for SearchFilter that answers ``?search=`` from the
+    full-text index of the model the view's ``search_fields`` point at
+    (directly, or through one foreign key such as ``task__title``).
+
+    Matches are annotated with ``search_rank`` and, unless the client asked
+    for an explicit ``?ordering=``, sorted best first. List this backend
+    after OrderingFilter so the rank takes precedence. Anything without a
+    full-text index falls back to SearchFilter's icontains lookups.
+    """
+
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        target = self._resolve_target(queryset.model, search_fields)
+        vendor = connections[queryset.db].vendor
+        if target is None or vendor not in ('postgresql', 'sqlite'):
+            return super().filter_queryset(request, queryset, view)
+
+        relation, model, fields = target
+        if vendor == 'postgresql':
+            queryset = self._filter_postgresql(queryset, relation, model, fields, search_terms)
+        else:
+            connection = connections[queryset.db]
+            if not _sqlite_fts_installed(connection, fts_table(model._meta.db_table)):
+                return super().filter_queryset(request, queryset, view)
+            queryset = self._filter_sqlite(queryset, relation, model, search_terms)
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by(f'-{self.rank_annotation}', *queryset.query.order_by)
+        return queryset
+
+    def _resolve_target(self, model, search_fields):
+        """(relation field or None, indexed model, indexed fields) for search_fields"""
+        prefixes = set()
+        names = []
+        for search_field in search_fields:
+            if search_field[0] in self.lookup_prefixes:
+                return None
+            prefix, _, name = search_field.rpartition('__')
+            prefixes.add(prefix)
+            names.append(name)
+        if len(prefixes) != 1:
+            return None
+
+        prefix = prefixes.pop()
+        relation = None
+        if prefix:
+            if '__' in prefix:
+                return None
+            relation = model._meta.get_field(prefix)
+            if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+                return None
+            model = relation.related_model
+
+        fields = FULL_TEXT_FIELDS.get(model._meta.label_lower)
+        if fields is None or not set(names) <= set(fields):
+            return None
+        return relation, model, fields
+
+    def _filter_postgresql(self, queryset, relation, model, fields, search_terms):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(' '.join(search_terms), search_type='websearch', config=SEARCH_CONFIG)
+        # The vector expression matches the GIN index created by CreateSearchIndex
+        matches = model._base_manager.annotate(search_vector=_search_vector(fields)).filter(search_vector=query)
+        if relation is None:
+            queryset = queryset.filter(pk__in=matches.values('pk'))
+            vector = _search_vector(fields)
+        else:
+            queryset = queryset.filter(**{f'{relation.name}__in': matches.values('pk')})
+            vector = _search_vector(fields, prefix=f'{relation.name}__')
+        # ts_rank() returns a float4, which doesn't compare exactly with the
+        # float8 a keyset cursor sends back; rank as float8 from the start
+        return queryset.annotate(**{self.rank_annotation: Cast(SearchRank(vector, query), FloatField())})
+
+    def _filter_sqlite(self, queryset, relation, model, search_terms):
+        fts = fts_table(model._meta.db_table)
+        # Quote every term so user input can't inject FTS5 syntax; the
+        # trailing * keeps search-as-you-type prefix matching
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in search_terms)
+        base_table = queryset.model._meta.db_table
+        column = relation.column if relation is not None else queryset.model._meta.pk.column
+        if queryset.query.group_by is None:
+            # Join the index: bm25() scores every match in one pass, where a
+            # correlated subquery recounts the term's matches for each row.
+            # bm25() is lower-is-better, so negate it to rank like PostgreSQL
+            return queryset.extra(
+                tables=[fts],
+                where=[f'{fts}.rowid = "{base_table}"."{column}"', f'{fts} MATCH %s'],
+                params=[match],
+            ).annotate(**{self.rank_annotation: RawSQL(f'-bm25({fts})', [], output_field=FloatField())})
+        # FTS5 can't run bm25() in a grouped query (e.g. projects with their
+        # tasks_count), so rank each row in a subquery there
+        lookup = f'{relation.attname}__in' if relation is not None else 'pk__in'
+        rank = RawSQL(
+            f'SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = "{base_table}"."{column}"',
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(
+            **{lookup: RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])}
+        ).annotate(**{self.rank_annotation: rank})
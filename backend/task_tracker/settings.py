@@ -43,9 +43,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "task_tracker.middleware.ProfilingMiddleware",
+    "task_tracker.middleware.MetricsMiddleware",
+    "task_tracker.middleware.QueryStatsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # For static files
+    "task_tracker.middleware.WhiteNoiseMiddleware",  # For static files
+    "task_tracker.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -73,13 +77,51 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "task_tracker.wsgi.application"
+ASGI_APPLICATION = "task_tracker.asgi.application"
+
+# Serve the hot read endpoints from async views (set by task_tracker.asgi;
+# under WSGI they would only add overhead)
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "False").lower() == "true"
 
 # Database
-if os.environ.get("DATABASE_URL"):
-    # Production database (PostgreSQL)
+DATABASE_POOL = os.environ.get("DATABASE_POOL", "False").lower() == "true"
+
+
+def database_from_url(url, conn_max_age):
     import dj_database_url
 
-    DATABASES = {"default": dj_database_url.parse(os.environ.get("DATABASE_URL"))}
+    database = dj_database_url.parse(url, conn_max_age=conn_max_age, conn_health_checks=True)
+    # Optional in-process connection pool for PostgreSQL
+    # (see task_tracker.postgresql_pool)
+    if DATABASE_POOL and database["ENGINE"] == "django.db.backends.postgresql":
+        database.update(
+            {
+                "ENGINE": "task_tracker.postgresql_pool",
+                # Connections go back to the pool at the end of each request
+                "CONN_MAX_AGE": 0,
+                "POOL": {
+                    "MIN_SIZE": int(os.environ.get("DATABASE_POOL_MIN_SIZE", "1")),
+                    "MAX_SIZE": int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+                    "MAX_IDLE": float(os.environ.get("DATABASE_POOL_MAX_IDLE", "300")),
+                    "TIMEOUT": float(os.environ.get("DATABASE_POOL_TIMEOUT", "5")),
+                },
+            }
+        )
+    return database
+
+
+# Keep connections open between requests, checking them before reuse.
+# Under ASGI requests run in short-lived threads that can't reuse them,
+# so persistent connections only make sense with the pool.
+DATABASE_CONN_MAX_AGE = int(
+    os.environ.get("DATABASE_CONN_MAX_AGE", "0" if ASYNC_VIEWS else "60")
+)
+
+if os.environ.get("DATABASE_URL"):
+    # Production database (PostgreSQL)
+    DATABASES = {
+        "default": database_from_url(os.environ.get("DATABASE_URL"), DATABASE_CONN_MAX_AGE)
+    }
 else:
     # Development database (SQLite)
     DATABASES = {
@@ -89,6 +131,22 @@ else:
         }
     }
 
+# Read replicas (comma-separated URLs): GET requests read from them in turn,
+# except for users who wrote within the last DATABASE_REPLICA_STICKINESS
+# seconds (see task_tracker.routers)
+DATABASE_REPLICAS = []
+for index, url in enumerate(
+    url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = database_from_url(url, DATABASE_CONN_MAX_AGE)
+    # Tests read the test database through the replica aliases
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_REPLICA_STICKINESS = float(os.environ.get("DATABASE_REPLICA_STICKINESS", "5"))
+DATABASE_ROUTERS = ["task_tracker.routers.ReplicaRouter"] if DATABASE_REPLICAS else []
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,6 +163,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ["accounts.backends.OffloadedHashingBackend"]
+
+# Password hashing runs on a small bounded thread pool (see accounts.hashing)
+PASSWORD_HASHING_WORKERS = int(os.environ.get("PASSWORD_HASHING_WORKERS", "2"))
+PASSWORD_HASHING_MAX_PENDING = int(os.environ.get("PASSWORD_HASHING_MAX_PENDING", "16"))
+PASSWORD_HASHING_QUEUE_TIMEOUT = float(
+    os.environ.get("PASSWORD_HASHING_QUEUE_TIMEOUT", "2.0")
+)
+
 # Internationalization
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
@@ -124,12 +191,26 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # orjson, with MessagePack for clients that ask for it and ?format=normalized
+    # for sideloaded related objects; the browsable API only in development
+    "DEFAULT_RENDERER_CLASSES": [
+        "task_tracker.renderers.ORJSONRenderer",
+        "task_tracker.renderers.MessagePackRenderer",
+        "task_tracker.renderers.NormalizedJSONRenderer",
+        *(["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else []),
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "task_tracker.parsers.ORJSONParser",
+        "task_tracker.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "task_tracker.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -143,8 +224,85 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.ClaimsTokenRefreshSerializer",
+}
+
+# How often (seconds) each process re-reads recently changed users to catch
+# role changes and revocations made elsewhere (see accounts.authentication)
+JWT_CHANGED_USERS_TTL = float(os.environ.get("JWT_CHANGED_USERS_TTL", "5"))
+
+# Activity log write-behind: queue log writes for a background thread
+# instead of doing them inside the request (see activity_logs.writebehind)
+ACTIVITY_LOG_WRITE_BEHIND = (
+    os.environ.get("ACTIVITY_LOG_WRITE_BEHIND", "False").lower() == "true"
+)
+ACTIVITY_LOG_QUEUE_SIZE = int(os.environ.get("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+ACTIVITY_LOG_BATCH_SIZE = int(os.environ.get("ACTIVITY_LOG_BATCH_SIZE", "500"))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.environ.get("ACTIVITY_LOG_FLUSH_INTERVAL", "1.0"))
+ACTIVITY_LOG_ENQUEUE_TIMEOUT = float(
+    os.environ.get("ACTIVITY_LOG_ENQUEUE_TIMEOUT", "0.05")
+)
+
+# Per-request profiling: Server-Timing headers and a log line per sampled
+# request (see task_tracker.profiling). Off by default
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "1.0"))
+PROFILING_SLOW_REQUEST_MS = float(os.environ.get("PROFILING_SLOW_REQUEST_MS", "500"))
+PROFILING_SLOW_QUERY_COUNT = int(os.environ.get("PROFILING_SLOW_QUERY_COUNT", "50"))
+
+# Per-fingerprint query timings for /api/query-stats/, and slow queries
+# logged with their plan (see task_tracker.querystats). Off by default
+QUERY_STATS_ENABLED = os.environ.get("QUERY_STATS_ENABLED", "False").lower() == "true"
+QUERY_STATS_SLOW_MS = float(os.environ.get("QUERY_STATS_SLOW_MS", "200"))
+QUERY_STATS_MAX_FINGERPRINTS = int(os.environ.get("QUERY_STATS_MAX_FINGERPRINTS", "500"))
+QUERY_STATS_SAMPLES = int(os.environ.get("QUERY_STATS_SAMPLES", "100"))
+# Inline the parameters into logged slow queries. They may hold password
+# hashes, emails and tokens, so only for debugging
+QUERY_STATS_LOG_PARAMS = os.environ.get("QUERY_STATS_LOG_PARAMS", "False").lower() == "true"
+
+# Prometheus metrics at /metrics (see task_tracker.metrics), behind the
+# METRICS_TOKEN bearer token, which is required. With several gunicorn
+# workers also set PROMETHEUS_MULTIPROC_DIR
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "False").lower() == "true"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "task_tracker.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "task_tracker.querystats": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
 }
 
+# Cache backend: local memory by default, any Django cache via env
+# (e.g. django.core.cache.backends.filebased.FileBasedCache + a directory,
+# or a Redis/Memcached backend shared by all workers in production)
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Response cache for the task and project lists (see task_tracker.cache).
+# Only enable it with a cache that all worker processes share.
+RESPONSE_CACHE_ENABLED = (
+    os.environ.get("RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+)
+RESPONSE_CACHE_ALIAS = os.environ.get("RESPONSE_CACHE_ALIAS", "default")
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Soft-deleted tasks and projects older than this many days are moved to the
+# archive tables by `manage.py archive_deleted` (see tasks.archive)
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+
 # CORS settings - Update for production
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -169,7 +327,6 @@ if not DEBUG:
     SECURE_CONTENT_TYPE_NOSNIFF = True
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_SECONDS = 31536000
-    SECURE_REDIRECT_EXEMPT = []
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
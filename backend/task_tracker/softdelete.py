@@ -0,0 +1,37 @@
+"""
+Soft deletion for Task and Project.
+
+``delete()`` only sets ``is_deleted`` and ``deleted_at``. The default
+manager, ``objects``, leaves those rows out of every query (and of reverse
+relations such as ``project.tasks``), along with the rows whose
+``live_relations`` are deleted, i.e. the tasks of a deleted project.
+``all_with_deleted`` sees them all. Forward foreign keys go through
+Django's base manager, so such a task still loads its deleted project.
+``manage.py archive_deleted`` later moves rows deleted long enough ago out
+of the hot tables (see tasks.archive).
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class LiveManager(models.Manager):
+    """Default manager that hides soft-deleted rows"""
+
+    # Foreign keys to soft-deletable models whose rows must be live too
+    live_relations = ()
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            is_deleted=False, **{f'{relation}__is_deleted': False for relation in self.live_relations}
+        )
+
+
+def stamp_deletion(instance):
+    """Keep ``deleted_at`` in step with ``is_deleted`` before a save"""
+    if 'is_deleted' in instance.get_deferred_fields():
+        # Not loaded, so not being changed either
+        return
+    if instance.is_deleted and instance.deleted_at is None:
+        instance.deleted_at = timezone.now()
+    elif not instance.is_deleted:
+        instance.deleted_at = None
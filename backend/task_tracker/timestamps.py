@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create() keep the given auto_now/auto_now_add values instead of
+    stamping the current time. The fields are switched for the whole
+    process, so this is for management commands, not requests.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from . import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -7,4 +8,9 @@ urlpatterns = [
     path('api/projects/', include('projects.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/activity-logs/', include('activity_logs.urls')),
+    path('api/cache/', views.response_cache_stats, name='response-cache-stats'),
+    path('api/db-pool/', views.database_pool_stats, name='database-pool-stats'),
+    path('api/password-hashing/', views.password_hashing_stats, name='password-hashing-stats'),
+    path('api/query-stats/', views.query_stats, name='query-stats'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
 ]
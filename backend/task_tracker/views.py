@@ -0,0 +1,83 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework import status
+from rest_framework.response import Response
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from accounts.hashing import get_pool
+from activity_logs.views import IsAdminPermission
+from . import metrics
+from .cache import cache_stats
+from .dbpool import pool_stats
+from .querystats import get_collector
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminPermission])
+def response_cache_stats(request):
+    """Response cache hit/miss counters for this worker process"""
+    return Response({
+        'enabled': settings.RESPONSE_CACHE_ENABLED,
+        'alias': settings.RESPONSE_CACHE_ALIAS,
+        **cache_stats(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminPermission])
+def database_pool_stats(request):
+    """Connection pool sizes and counters for this worker process, by database alias"""
+    return Response(pool_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminPermission])
+def password_hashing_stats(request):
+    """Password hashing pool size and completed/rejected counters for this worker process"""
+    return Response(get_pool().stats())
+
+
+QUERY_STATS_ORDERS = ('total_ms', 'count', 'avg_ms', 'max_ms', 'p95_ms')
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminPermission])
+def query_stats(request):
+    """
+    The query fingerprints that took the most time in this worker process,
+    by view. ``?order=`` one of QUERY_STATS_ORDERS (default total_ms),
+    ``?limit=`` (default 20). DELETE resets the counters.
+    """
+    if not settings.QUERY_STATS_ENABLED:
+        return Response({'enabled': False})
+    collector = get_collector()
+    if request.method == 'DELETE':
+        collector.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    order = request.query_params.get('order', 'total_ms')
+    if order not in QUERY_STATS_ORDERS:
+        return Response(
+            {'order': f'Must be one of {", ".join(QUERY_STATS_ORDERS)}.'}, status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        limit = max(1, int(request.query_params.get('limit', 20)))
+    except ValueError:
+        return Response({'limit': 'Must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'enabled': True, **collector.stats(limit, order)})
+
+
+@require_GET
+def prometheus_metrics(request):
+    """
+    Prometheus text format, for scrapers rather than API clients: no JWT,
+    but the METRICS_TOKEN bearer token. Never served without one
+    """
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise Http404
+    if not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+    ):
+        return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer'})
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
@@ -1,9 +1,25 @@
 from django.contrib import admin
-from .models import Task
+from .models import Task, TaskArchive
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ['title', 'project', 'assigned_to', 'status', 'due_date', 'created_at', 'is_deleted']
     list_filter = ['status', 'is_deleted', 'created_at', 'due_date', 'project']
     search_fields = ['title', 'description']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'deleted_at']
+    
+    def get_queryset(self, request):
+        # Admins can see and undelete soft-deleted tasks
+        return Task.all_with_deleted.all()
+
+@admin.register(TaskArchive)
+class TaskArchiveAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'project_id', 'assigned_to_id', 'status', 'deleted_at', 'archived_at']
+    list_filter = ['archived_at']
+    search_fields = ['title']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
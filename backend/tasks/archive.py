@@ -0,0 +1,186 @@
+"""
+Moving soft-deleted tasks and projects out of the hot tables, and back.
+
+``archive_expired`` moves tasks deleted before a cutoff to TaskArchive,
+with their ActivityLog and TaskEvents, then does the same for projects.
+A deleted project takes all its tasks along, deleted or not (the live
+manager already hides them). Rows keep
+their ids. Each batch of at most ``batch_size`` tasks or projects is copied
+and deleted in its own transaction, so locks stay short and an interrupted
+run picks up where it stopped on the next one.
+
+``restore_tasks`` and ``restore_projects`` bring archived rows back as
+live ones. They run from ``manage.py archive_deleted``: restoring keeps
+the original created_at, which means switching off auto_now_add for the
+whole process while it inserts.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from activity_logs.models import ActivityLog, ActivityLogArchive, TaskEvent, TaskEventArchive
+from projects.models import Project, ProjectArchive
+from task_tracker.cache import invalidate_on_commit
+from task_tracker.timestamps import explicit_timestamps
+from .models import Task, TaskArchive
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _columns(archive_model):
+    """The columns an archive table shares with its hot table"""
+    return [field.attname for field in archive_model._meta.concrete_fields if field.attname != 'archived_at']
+
+
+def expired_projects(cutoff):
+    return Project.all_with_deleted.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+
+def expired_tasks(cutoff):
+    return Task.all_with_deleted.filter(
+        Q(is_deleted=True, deleted_at__lt=cutoff) | Q(project__in=expired_projects(cutoff).values('pk'))
+    )
+
+
+def archive_expired(cutoff, batch_size):
+    """Archive everything soft-deleted before ``cutoff``; yields (kind, count) per batch"""
+    tasks = expired_tasks(cutoff)
+    while count := _archive_tasks(tasks, batch_size):
+        yield 'tasks', count
+    # Only once their tasks have moved, as deleting a project cascades to them
+    projects = expired_projects(cutoff).filter(~Exists(Task.all_with_deleted.filter(project=OuterRef('pk'))))
+    while count := _archive_projects(projects, batch_size):
+        yield 'projects', count
+
+
+@transaction.atomic
+def _archive_tasks(tasks, batch_size):
+    rows = list(tasks.select_for_update().order_by('pk').values(*_columns(TaskArchive))[:batch_size])
+    if not rows:
+        return 0
+    ids = [row['id'] for row in rows]
+    now = timezone.now()
+    TaskArchive.objects.bulk_create([TaskArchive(**row, archived_at=now) for row in rows])
+    ActivityLogArchive.objects.bulk_create([
+        ActivityLogArchive(**row, archived_at=now)
+        for row in ActivityLog.objects.filter(task_id__in=ids).values(*_columns(ActivityLogArchive))
+    ])
+    TaskEventArchive.objects.bulk_create([
+        TaskEventArchive(**row, archived_at=now)
+        for row in TaskEvent.objects.filter(task_id__in=ids).values(*_columns(TaskEventArchive))
+    ])
+    # Cascades to the activity logs and events just copied
+    Task.all_with_deleted.filter(pk__in=ids).delete()
+    return len(ids)
+
+
+@transaction.atomic
+def _archive_projects(projects, batch_size):
+    rows = list(projects.select_for_update().order_by('pk').values(*_columns(ProjectArchive))[:batch_size])
+    if not rows:
+        return 0
+    now = timezone.now()
+    ProjectArchive.objects.bulk_create([ProjectArchive(**row, archived_at=now) for row in rows])
+    Project.all_with_deleted.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def _existing(model, ids):
+    return set(model._base_manager.filter(pk__in=ids).values_list('pk', flat=True))
+
+
+def _live(now):
+    # Restoring is a change: a new updated_at moves the list validators on
+    return {'is_deleted': False, 'deleted_at': None, 'updated_at': now}
+
+
+def _locked(archive_model, ids):
+    rows = list(archive_model.objects.select_for_update().filter(pk__in=ids))
+    missing = set(ids) - {row.pk for row in rows}
+    if missing:
+        name = archive_model._meta.verbose_name
+        raise ArchiveError(f"No {name} with id {', '.join(map(str, sorted(missing)))}")
+    return rows
+
+
+@transaction.atomic
+def restore_tasks(ids):
+    """Bring the archived tasks ``ids`` back, undeleted; their projects must not be archived"""
+    archived = _locked(TaskArchive, ids)
+    with explicit_timestamps(Task, ActivityLog):
+        _restore_tasks(archived)
+    return len(archived)
+
+
+@transaction.atomic
+def restore_projects(ids):
+    """
+    Bring the archived projects ``ids`` back, undeleted, with the tasks that
+    were archived along with them; tasks deleted on their own stay archived,
+    as do tasks whose assignee no longer exists. Returns (projects, tasks).
+    """
+    archived = _locked(ProjectArchive, ids)
+    owners = _existing(get_user_model(), {project.owner_id for project in archived})
+    missing = sorted(project.pk for project in archived if project.owner_id not in owners)
+    if missing:
+        raise ArchiveError(f"The owners of projects {', '.join(map(str, missing))} no longer exist")
+
+    now = timezone.now()
+    columns = _columns(ProjectArchive)
+    tasks = list(TaskArchive.objects.select_for_update().filter(project_id__in=ids, is_deleted=False))
+    assignees = _existing(get_user_model(), {task.assigned_to_id for task in tasks})
+    tasks = [task for task in tasks if task.assigned_to_id in assignees]
+    with explicit_timestamps(Project, Task, ActivityLog):
+        Project.all_with_deleted.bulk_create([
+            Project(**{column: getattr(project, column) for column in columns} | _live(now))
+            for project in archived
+        ])
+        _restore_tasks(tasks, now)
+    ProjectArchive.objects.filter(pk__in=ids).delete()
+    invalidate_on_commit('project')
+    return len(archived), len(tasks)
+
+
+def _restore_tasks(archived, now=None):
+    """Move TaskArchive rows back with their history; run inside explicit_timestamps()"""
+    if not archived:
+        return
+    now = now or timezone.now()
+    projects = _existing(Project, {task.project_id for task in archived})
+    missing = sorted({task.project_id for task in archived} - projects)
+    if missing:
+        raise ArchiveError(f"Projects {', '.join(map(str, missing))} are archived; restore them first")
+    assignees = _existing(get_user_model(), {task.assigned_to_id for task in archived})
+    missing = sorted(task.pk for task in archived if task.assigned_to_id not in assignees)
+    if missing:
+        raise ArchiveError(f"The assignees of tasks {', '.join(map(str, missing))} no longer exist")
+
+    ids = [task.pk for task in archived]
+    columns = _columns(TaskArchive)
+    Task.all_with_deleted.bulk_create([
+        Task(**{column: getattr(task, column) for column in columns} | _live(now))
+        for task in archived
+    ])
+
+    logs = list(ActivityLogArchive.objects.filter(task_id__in=ids))
+    events = list(TaskEventArchive.objects.filter(task_id__in=ids))
+    # Users deleted since were set to NULL in the hot tables; do the same here
+    users = _existing(get_user_model(), {log.previous_assignee_id for log in logs}
+                      | {log.updated_by_id for log in logs} | {event.actor_id for event in events})
+    ActivityLog.objects.bulk_create([
+        ActivityLog(**{column: getattr(log, column) for column in _columns(ActivityLogArchive)}
+                    | {column: None for column in ('previous_assignee_id', 'updated_by_id')
+                       if getattr(log, column) not in users})
+        for log in logs
+    ])
+    TaskEvent.objects.bulk_create([
+        TaskEvent(**{column: getattr(event, column) for column in _columns(TaskEventArchive)}
+                  | ({'actor_id': None} if event.actor_id not in users else {}))
+        for event in events
+    ])
+    ActivityLogArchive.objects.filter(task_id__in=ids).delete()
+    TaskEventArchive.objects.filter(task_id__in=ids).delete()
+    TaskArchive.objects.filter(pk__in=ids).delete()
+    invalidate_on_commit('task')
@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from projects.models import Project
+from .models import Task
+from .serializers import TaskBulkCreateSerializer, TaskBulkUpdateSerializer
+from .signals import tasks_bulk_updated
+
+BULK_MAX_ITEMS = 1000
+BULK_BATCH_SIZE = 500
+
+
+class BulkRequestSerializer(serializers.Serializer):
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate(self, attrs):
+        if sum(len(items) for items in attrs.values()) > BULK_MAX_ITEMS:
+            raise serializers.ValidationError(f"At most {BULK_MAX_ITEMS} operations per request")
+        return attrs
+
+
+def _ids(values):
+    ids = set()
+    for value in values:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            pass
+    return ids
+
+
+def _error(index, status_code, errors):
+    return {'index': index, 'status': status_code, 'errors': errors}
+
+
+def apply_bulk_operations(operations, request):
+    """
+    Validate every create/update/delete, then apply them all in one
+    transaction with a fixed number of queries. Returns (ok, results); when
+    anything is invalid nothing is written and results hold the errors.
+    """
+    user = request.user
+    creates, updates, deletes = operations['create'], operations['update'], operations['delete']
+    errors = {'create': [], 'update': [], 'delete': []}
+
+    with transaction.atomic():
+        # Every foreign key and task the request mentions, loaded up front
+        context = {
+            'request': request,
+            'project_ids': set(Project.objects.filter(
+                pk__in=_ids(item.get('project') for item in creates)
+            ).values_list('pk', flat=True)),
+            'user_ids': set(get_user_model().objects.filter(
+                pk__in=_ids(item.get('assigned_to') for item in creates + updates)
+            ).values_list('pk', flat=True)),
+        }
+        # TaskPermission's object rule, checked in SQL for the whole id set
+        task_ids = _ids(item.get('id') for item in updates) | set(deletes)
+        tasks = {
+            task.pk: task
+            for task in Task.objects.filter(pk__in=task_ids)
+            .visible_to(user).select_for_update()
+        }
+
+        new_tasks = []
+        for index, item in enumerate(creates):
+            if not user.is_admin:
+                errors['create'].append(_error(index, status.HTTP_403_FORBIDDEN, {'detail': 'Only admins can create tasks'}))
+                continue
+            serializer = TaskBulkCreateSerializer(data=item, context=context)
+            if serializer.is_valid():
+                new_tasks.append(Task(**serializer.validated_data))
+            else:
+                errors['create'].append(_error(index, status.HTTP_400_BAD_REQUEST, serializer.errors))
+
+        updated_tasks = []
+        seen = set()
+        for index, item in enumerate(updates):
+            task_id = _ids([item.get('id')])
+            task = tasks.get(next(iter(task_id))) if task_id else None
+            if not task_id:
+                errors['update'].append(_error(index, status.HTTP_400_BAD_REQUEST, {'id': ['This field is required.']}))
+            elif task_id & seen:
+                errors['update'].append(_error(index, status.HTTP_400_BAD_REQUEST, {'id': ['Duplicate task.']}))
+            elif task is None:
+                errors['update'].append(_error(index, status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}))
+            else:
+                seen |= task_id
+                serializer = TaskBulkUpdateSerializer(task, data=item, partial=True, context=context)
+                if serializer.is_valid():
+                    for attr, value in serializer.validated_data.items():
+                        setattr(task, attr, value)
+                    updated_tasks.append((index, task))
+                else:
+                    errors['update'].append(_error(index, status.HTTP_400_BAD_REQUEST, serializer.errors))
+
+        seen = set()
+        for index, task_id in enumerate(deletes):
+            if not user.is_admin:
+                errors['delete'].append(_error(index, status.HTTP_403_FORBIDDEN, {'detail': 'Only admins can delete tasks'}))
+            elif task_id in seen:
+                errors['delete'].append(_error(index, status.HTTP_400_BAD_REQUEST, {'id': ['Duplicate task.']}))
+            elif task_id not in tasks:
+                errors['delete'].append(_error(index, status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}))
+            seen.add(task_id)
+
+        if any(errors.values()):
+            return False, errors
+
+        now = timezone.now()
+        Task.objects.bulk_create(new_tasks, batch_size=BULK_BATCH_SIZE)
+
+        # bulk_update skips save() and its signals, so handle updated_at and
+        # the activity log here
+        changed = [task for _index, task in updated_tasks if task.get_dirty_fields()]
+        fields = {name for task in changed for name in task.get_dirty_fields()}
+        changes = [
+            (task, {attname: task.get_loaded_value(attname) for attname in Task.TRACKED_FIELDS})
+            for task in changed if task.has_tracked_changes()
+        ]
+        for task in changed:
+            task.updated_at = now
+        if changed:
+            Task.objects.bulk_update(changed, sorted(fields) + ['updated_at'], batch_size=BULK_BATCH_SIZE)
+        tasks_bulk_updated.send(sender=Task, changes=changes, actor=user)
+        for task in changed:
+            task._snapshot()
+
+        if deletes:
+            Task.objects.filter(pk__in=deletes).update(is_deleted=True, deleted_at=now, updated_at=now)
+
+    return True, {
+        'create': [{'index': index, 'status': status.HTTP_201_CREATED, 'id': task.pk}
+                   for index, task in enumerate(new_tasks)],
+        'update': [{'index': index, 'status': status.HTTP_200_OK, 'id': task.pk}
+                   for index, task in updated_tasks],
+        'delete': [{'index': index, 'status': status.HTTP_204_NO_CONTENT, 'id': task_id}
+                   for index, task_id in enumerate(deletes)],
+    }
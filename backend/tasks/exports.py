@@ -0,0 +1,140 @@
+import csv
+import zlib
+from datetime import timedelta
+import orjson
+from django.db.models import Case, CharField, Q, Value, When
+from task_tracker.renderers import ORJSONRenderer
+from .models import Task
+from .serializers import TaskSerializer
+
+EXPORT_CHUNK_SIZE = 500
+
+# Exported tasks embed their project (with its owner) and assignee
+EXPORT_EXPANSIONS = ['project.owner', 'assigned_to']
+
+# Alphabetical, which is also the order the sections appear in the JSON export
+EXPORT_CATEGORIES = ['due_soon', 'overdue', 'recently_completed']
+
+EXPORT_CONTENT_TYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CSV_COLUMNS = [
+    'category', 'id', 'title', 'description', 'status', 'due_date',
+    'project_id', 'project_title', 'assigned_to_id', 'assigned_to_username',
+    'created_at', 'updated_at',
+]
+
+
+class NDJSONExportRenderer(ORJSONRenderer):
+    """Lets ?format=ndjson through content negotiation; errors still render as JSON"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVExportRenderer(ORJSONRenderer):
+    """Lets ?format=csv through content negotiation; errors still render as JSON"""
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+def export_queryset(now):
+    """All exported tasks in one query, tagged with their export category"""
+    open_statuses = ['todo', 'in_progress']
+    conditions = {
+        'due_soon': Q(status__in=open_statuses, due_date__gte=now, due_date__lte=now + timedelta(hours=48)),
+        'overdue': Q(status__in=open_statuses, due_date__lt=now),
+        'recently_completed': Q(status='done', updated_at__gte=now - timedelta(hours=24)),
+    }
+    any_category = Q()
+    for condition in conditions.values():
+        any_category |= condition
+
+    return (
+        Task.objects.filter(any_category)
+        .annotate(export_category=Case(
+            *[When(condition, then=Value(name)) for name, condition in conditions.items()],
+            output_field=CharField(),
+        ))
+        .with_related()
+        .order_by('export_category', '-created_at', 'id')
+    )
+
+
+def _dumps(value):
+    return orjson.dumps(value).decode()
+
+
+def _iter_tasks(queryset):
+    for task in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield task.export_category, TaskSerializer(task, expand=EXPORT_EXPANSIONS).data
+
+
+def iter_json(queryset, now):
+    """Stream the classic {"due_soon": [...], ...} document one task at a time"""
+    yield '{'
+    remaining = list(EXPORT_CATEGORIES)
+    current = None
+    first_in_section = True
+    for category, data in _iter_tasks(queryset):
+        if category != current:
+            if current is not None:
+                yield '], '
+            # Open every section up to this one, emitting empty ones on the way
+            while remaining[0] != category:
+                yield _dumps(remaining.pop(0)) + ': [], '
+            yield _dumps(remaining.pop(0)) + ': ['
+            current = category
+            first_in_section = True
+        yield ('' if first_in_section else ', ') + _dumps(data)
+        first_in_section = False
+    if current is not None:
+        yield '], '
+    for category in remaining:
+        yield _dumps(category) + ': [], '
+    yield '"exported_at": ' + _dumps(now.isoformat()) + '}'
+
+
+def iter_ndjson(queryset, now):
+    for category, data in _iter_tasks(queryset):
+        yield _dumps({'category': category, **data}) + '\n'
+
+
+class _Echo:
+    """File-like object that hands back whatever csv.writer writes to it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, now):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_COLUMNS)
+    for category, data in _iter_tasks(queryset):
+        project = data['project'] or {}
+        assigned_to = data['assigned_to'] or {}
+        yield writer.writerow([
+            category, data['id'], data['title'], data['description'], data['status'],
+            data['due_date'], project.get('id'), project.get('title'),
+            assigned_to.get('id'), assigned_to.get('username'),
+            data['created_at'], data['updated_at'],
+        ])
+
+
+EXPORT_WRITERS = {
+    'json': iter_json,
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+}
+
+
+def gzip_stream(chunks):
+    """Compress a stream of strings on the fly without buffering it"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from tasks.archive import ArchiveError, archive_expired, restore_projects, restore_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Move tasks and projects soft-deleted more than --days ago, with their activity logs, "
+        "into the archive tables; or bring archived ones back with --restore-task/--restore-project"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help="Archive rows deleted at least this many days ago (default: ARCHIVE_AFTER_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help="Tasks or projects moved per transaction (default: ARCHIVE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--restore-task", type=int, nargs="+", default=[], metavar="ID",
+            help="Restore these archived tasks as live tasks instead of archiving",
+        )
+        parser.add_argument(
+            "--restore-project", type=int, nargs="+", default=[], metavar="ID",
+            help="Restore these archived projects, with the tasks archived along with them",
+        )
+
+    def handle(self, *args, **options):
+        if options["restore_task"] or options["restore_project"]:
+            self.restore(options["restore_project"], options["restore_task"])
+            return
+        if options["days"] < 0:
+            raise CommandError("--days can't be negative")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        totals = {"tasks": 0, "projects": 0}
+        for kind, count in archive_expired(cutoff, options["batch_size"]):
+            totals[kind] += count
+            self.stdout.write(f"Archived {count} {kind} ({totals[kind]} so far)")
+        self.stdout.write(
+            f"Archived {totals['tasks']} tasks and {totals['projects']} projects deleted before {cutoff:%Y-%m-%d %H:%M}"
+        )
+
+    def restore(self, project_ids, task_ids):
+        try:
+            # Projects first, so their tasks can follow
+            if project_ids:
+                projects, tasks = restore_projects(project_ids)
+                self.stdout.write(f"Restored {projects} projects with {tasks} of their tasks")
+            if task_ids:
+                self.stdout.write(f"Restored {restore_tasks(task_ids)} tasks")
+        except ArchiveError as exc:
+            raise CommandError(str(exc))
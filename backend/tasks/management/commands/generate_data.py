@@ -0,0 +1,266 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from accounts.models import User
+from activity_logs.models import ActivityLog, TaskEvent
+from activity_logs.partitions import ensure_partitions, month_start
+from projects.models import Project
+from task_tracker.cache import bump_version
+from task_tracker.timestamps import explicit_timestamps
+from tasks.models import Task
+
+FIRST_NAMES = ["Ada", "Ben", "Chloe", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas", "Kemi", "Liam",
+               "Maya", "Nico", "Olga", "Priya", "Quinn", "Rosa", "Sami", "Tara", "Umar", "Vera", "Wen", "Yusuf"]
+LAST_NAMES = ["Adams", "Brown", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Hansen", "Ito", "Jones", "Khan",
+              "Lopez", "Moreau", "Nowak", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Walker", "Young", "Zhou"]
+VERBS = ["Design", "Implement", "Review", "Test", "Document", "Refactor", "Deploy", "Migrate", "Fix", "Audit",
+         "Plan", "Optimize", "Update", "Investigate", "Prototype"]
+NOUNS = ["login flow", "billing page", "search index", "API client", "dashboard", "onboarding emails",
+         "export job", "permissions", "mobile layout", "release notes", "error reporting", "data model",
+         "payment webhook", "settings screen", "audit trail", "cache layer", "CI pipeline", "invoice PDFs"]
+PROJECT_KINDS = ["Platform", "Website", "Mobile App", "Data Warehouse", "Internal Tools", "Marketing Site",
+                 "Partner API", "Support Portal", "Infrastructure", "Analytics"]
+PROJECT_CODENAMES = ["Atlas", "Beacon", "Comet", "Delta", "Ember", "Falcon", "Glacier", "Harbor", "Iris",
+                     "Juniper", "Kestrel", "Lumen", "Meridian", "Nova", "Orion", "Pioneer", "Quartz", "Summit"]
+
+# Status odds of a task due in the future, in the last 30 days and before that
+STATUSES = ["todo", "in_progress", "done"]
+STATUS_WEIGHTS_UPCOMING = [50, 35, 15]
+STATUS_WEIGHTS_RECENTLY_DUE = [15, 30, 55]
+STATUS_WEIGHTS_LONG_DUE = [3, 4, 93]
+
+# Chance that a field change is to each tracked field, and the prior
+# status a change to each status usually came from
+EVENT_FIELDS = ["status", "assigned_to", "due_date"]
+EVENT_FIELD_WEIGHTS = [5, 3, 2]
+PREVIOUS_STATUS = {"done": "in_progress", "in_progress": "todo", "todo": "in_progress"}
+
+
+def skewed_weights(rng, count):
+    """Cumulative Pareto weights: a few items get most of the picks, like real projects and assignees"""
+    return list(accumulate(rng.paretovariate(1.16) for _ in range(count)))
+
+
+def batches(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic data set (users, projects, tasks and their activity history) for "
+        "load testing. The same --seed always produces the same data, relative to the current time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--admins", type=int, default=None,
+                            help="How many of the users are admins (default: 1%%, at least one)")
+        parser.add_argument("--projects", type=int, default=50_000)
+        parser.add_argument("--tasks", type=int, default=5_000_000)
+        parser.add_argument("--events-per-task", type=float, default=2.0,
+                            help="Average number of recorded field changes per task")
+        parser.add_argument("--days", type=int, default=365, help="How far back the history goes")
+        parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per bulk insert")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--prefix", default="synthetic",
+                            help="Usernames are <prefix>_<n>; the prefix must not be in use yet")
+        parser.add_argument("--password", default="password", help="Password of every generated user")
+
+    def handle(self, *args, **options):
+        for name in ("users", "projects", "tasks", "batch_size", "days"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+        if options["events_per_task"] < 0:
+            raise CommandError("--events-per-task can't be negative")
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(f"bulk_create() doesn't return ids on {connection.vendor}; the history needs them")
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Users named {prefix}_* already exist; pick another --prefix")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=options["days"])
+
+        if connection.vendor == "postgresql":
+            months = (self.now.year - self.start.year) * 12 + self.now.month - self.start.month + 1
+            ensure_partitions(connection, month_start(self.start.date()), months)
+
+        with explicit_timestamps(User, Project, Task, ActivityLog):
+            admins = options["admins"] if options["admins"] is not None else max(1, options["users"] // 100)
+            admin_ids, contributor_ids = self.create_users(options["users"], min(admins, options["users"]),
+                                                           prefix, options["password"])
+            projects = self.create_projects(options["projects"], admin_ids)
+            self.create_tasks(options["tasks"], projects, admin_ids, contributor_ids or admin_ids,
+                              options["events_per_task"])
+
+        # bulk_create() sends no save signals, so drop the cached responses here
+        for name in ("user", "project", "task"):
+            bump_version(name)
+
+    def random_time(self, after, before=None):
+        before = before or self.now
+        return after + (before - after) * self.rng.random()
+
+    def create_users(self, total, admins, prefix, password):
+        rng = self.rng
+        # One hash for everyone: hashing 10k passwords would take minutes
+        encoded = make_password(password)
+        admin_ids, contributor_ids = [], []
+        for start, size in batches(total, self.batch_size):
+            users = []
+            for number in range(start, start + size):
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                joined = self.random_time(self.start - timedelta(days=90), self.now - timedelta(days=1))
+                users.append(User(
+                    username=f"{prefix}_{number}",
+                    email=f"{first_name}.{last_name}.{number}@example.com".lower(),
+                    first_name=first_name,
+                    last_name=last_name,
+                    role="admin" if number < admins else "contributor",
+                    password=encoded,
+                    date_joined=joined,
+                    created_at=joined,
+                    updated_at=joined,
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            for user in users:
+                (admin_ids if user.role == "admin" else contributor_ids).append(user.pk)
+        self.stdout.write(f"Created {total} users ({admins} admins); password {password!r}")
+        return admin_ids, contributor_ids
+
+    def create_projects(self, total, admin_ids):
+        """[(id, created_at)] of the new projects"""
+        rng = self.rng
+        projects = []
+        for start, size in batches(total, self.batch_size):
+            batch = []
+            for number in range(start, start + size):
+                created = self.random_time(self.start)
+                batch.append(Project(
+                    title=f"{rng.choice(PROJECT_CODENAMES)} {rng.choice(PROJECT_KINDS)} {number}",
+                    description=f"{rng.choice(VERBS)} the {rng.choice(NOUNS)} and everything around it.",
+                    owner_id=rng.choice(admin_ids),
+                    created_at=created,
+                    updated_at=self.random_time(created),
+                    is_deleted=rng.random() < 0.01,
+                ))
+            # Soft-deleted at their last update
+            for project in batch:
+                project.deleted_at = project.updated_at if project.is_deleted else None
+            with transaction.atomic():
+                Project.objects.bulk_create(batch)
+            projects += [(project.pk, project.created_at) for project in batch]
+        self.stdout.write(f"Created {total} projects")
+        return projects
+
+    def create_tasks(self, total, projects, admin_ids, contributor_ids, events_per_task):
+        rng = self.rng
+        project_weights = skewed_weights(rng, len(projects))
+        assignee_weights = skewed_weights(rng, len(contributor_ids))
+        # Geometric number of changes per task, with the requested mean
+        change_chance = events_per_task / (1 + events_per_task)
+        created_tasks = created_events = 0
+
+        for start, size in batches(total, self.batch_size):
+            tasks = []
+            picked_projects = rng.choices(projects, cum_weights=project_weights, k=size)
+            assignees = rng.choices(contributor_ids, cum_weights=assignee_weights, k=size)
+            for (project_id, project_created), assignee_id in zip(picked_projects, assignees):
+                created = self.random_time(project_created)
+                due = created + timedelta(days=rng.lognormvariate(2.3, 0.8))
+                # Most tasks get done around their due date; a tail stays open and overdue
+                status = rng.choices(STATUSES, weights=self.status_weights(due))[0]
+                tasks.append(Task(
+                    title=f"{rng.choice(VERBS)} {rng.choice(NOUNS)}",
+                    description=f"{rng.choice(VERBS)} the {rng.choice(NOUNS)} for the {rng.choice(NOUNS)}.",
+                    status=status,
+                    due_date=due,
+                    project_id=project_id,
+                    assigned_to_id=assignee_id,
+                    created_at=created,
+                    updated_at=self.random_time(created, min(due, self.now) if status == "done" else None),
+                    is_deleted=rng.random() < 0.02,
+                ))
+
+            for task in tasks:
+                task.deleted_at = task.updated_at if task.is_deleted else None
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks)
+                logs, events = [], []
+                for task in tasks:
+                    changes = 0
+                    while rng.random() < change_chance:
+                        changes += 1
+                    if changes:
+                        log, task_events = self.build_history(task, changes, admin_ids, contributor_ids)
+                        logs.append(log)
+                        events += task_events
+                ActivityLog.objects.bulk_create(logs, batch_size=self.batch_size)
+                TaskEvent.objects.bulk_create(events, batch_size=self.batch_size)
+            created_tasks += size
+            created_events += len(events)
+            if created_tasks % (self.batch_size * 20) == 0 or created_tasks == total:
+                self.stdout.write(f"Created {created_tasks}/{total} tasks, {created_events} history events")
+
+    def status_weights(self, due):
+        if due > self.now:
+            return STATUS_WEIGHTS_UPCOMING
+        if due > self.now - timedelta(days=30):
+            return STATUS_WEIGHTS_RECENTLY_DUE
+        return STATUS_WEIGHTS_LONG_DUE
+
+    def build_history(self, task, changes, admin_ids, contributor_ids):
+        """
+        The task's ActivityLog and ``changes`` TaskEvents that end in its
+        current values, worked out backwards from the latest change.
+        """
+        rng = self.rng
+        times = sorted(self.random_time(task.created_at, task.updated_at) for _ in range(changes))
+        state = {"status": task.status, "assigned_to": task.assigned_to_id, "due_date": task.due_date}
+        events = []
+        for changed_at in reversed(times):
+            field = rng.choices(EVENT_FIELDS, weights=EVENT_FIELD_WEIGHTS)[0]
+            new = state[field]
+            if field == "status":
+                old = PREVIOUS_STATUS[new]
+            elif field == "assigned_to":
+                old = rng.choice(contributor_ids)
+            else:
+                old = new - timedelta(days=rng.randint(1, 14))
+            actor_id = rng.choice(admin_ids) if rng.random() < 0.6 else task.assigned_to_id
+            if not events:
+                # The log keeps the values from before the latest change
+                previous = dict(state, **{field: old})
+                log = ActivityLog(
+                    task_id=task.pk,
+                    previous_assignee_id=previous["assigned_to"],
+                    previous_status=previous["status"],
+                    previous_due_date=previous["due_date"],
+                    updated_at=changed_at,
+                    updated_by_id=actor_id,
+                )
+            events.append(TaskEvent(
+                task_id=task.pk,
+                field=field,
+                old_value=_as_text(old),
+                new_value=_as_text(new),
+                actor_id=actor_id,
+                created_at=changed_at,
+            ))
+            state[field] = old
+        return log, events
+
+
+def _as_text(value):
+    # Same text as activity_logs.signals records
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["-created_at", "id"],
+                name="task_live_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["assigned_to", "-created_at"],
+                name="task_live_assignee_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["status", "due_date"],
+                name="task_live_status_due_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", False)),
+                fields=["project", "status"],
+                name="task_live_project_status_idx",
+            ),
+        ),
+    ]
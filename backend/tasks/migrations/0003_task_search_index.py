@@ -0,0 +1,16 @@
+from django.db import migrations
+from task_tracker.search import CreateSearchIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0002_task_live_indexes"),
+    ]
+
+    operations = [
+        CreateSearchIndex(
+            model_name="task",
+            fields=["title", "description"],
+            name="task_search_idx",
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:13
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_deleted_at(apps, schema_editor):
+    # The last update of an already deleted task is the best guess of when it happened
+    Task = apps.get_model("tasks", "Task")
+    Task.objects.filter(is_deleted=True).update(deleted_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskArchive",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=200)),
+                ("description", models.TextField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("todo", "Todo"),
+                            ("in_progress", "In Progress"),
+                            ("done", "Done"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("due_date", models.DateTimeField()),
+                ("project_id", models.BigIntegerField()),
+                ("assigned_to_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("is_deleted", models.BooleanField()),
+                ("deleted_at", models.DateTimeField(null=True)),
+                ("archived_at", models.DateTimeField()),
+            ],
+            options={
+                "ordering": ["-archived_at", "-id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_deleted_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_deleted", True)),
+                fields=["deleted_at"],
+                name="task_deleted_at_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskarchive",
+            index=models.Index(fields=["project_id"], name="taskarchive_project_idx"),
+        ),
+    ]
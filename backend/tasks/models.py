@@ -1,6 +1,31 @@
 from django.db import models
 from django.conf import settings
 from projects.models import Project
+from task_tracker.softdelete import LiveManager, stamp_deletion
+
+
+class LiveTaskManager(LiveManager):
+    # A deleted project hides its tasks until it is restored or archived
+    live_relations = ('project',)
+
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Contributors only ever see the tasks assigned to them"""
+        if user.is_contributor:
+            return self.filter(assigned_to=user)
+        return self
+
+    def with_related(self):
+        """Load everything a fully expanded TaskSerializer nests in a fixed number of queries"""
+        return self.select_related('assigned_to').prefetch_related(
+            models.Prefetch(
+                'project',
+                # Also for tasks loaded through all_with_deleted
+                queryset=Project.all_with_deleted.select_related('owner').with_tasks_count(),
+            )
+        )
+
 
 class Task(models.Model):
     STATUS_CHOICES = [
@@ -18,14 +43,144 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    # Live tasks of live projects only; all_with_deleted includes the rest
+    objects = LiveTaskManager.from_queryset(TaskQuerySet)()
+    all_with_deleted = TaskQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        # Partial indexes: every live query filters is_deleted=False (the
+        # default manager adds it), archiving looks up deleted rows by age
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], condition=models.Q(is_deleted=False),
+                         name='task_live_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at'], condition=models.Q(is_deleted=False),
+                         name='task_live_assignee_created_idx'),
+            models.Index(fields=['status', 'due_date'], condition=models.Q(is_deleted=False),
+                         name='task_live_status_due_idx'),
+            models.Index(fields=['project', 'status'], condition=models.Q(is_deleted=False),
+                         name='task_live_project_status_idx'),
+            models.Index(fields=['deleted_at'], condition=models.Q(is_deleted=True),
+                         name='task_deleted_at_idx'),
+        ]
+    
+    # Changes to these fields are recorded in the activity log
+    TRACKED_FIELDS = ['assigned_to_id', 'status', 'due_date']
     
     def __str__(self):
         return f"{self.title} - {self.project.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot what was loaded so saves and activity logging can diff
+        # against it instead of re-reading the row. Only rows read from the
+        # database get one: the values of an instance built in Python (even
+        # with a pk) aren't known to match the row, so it saves every column
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        # Also runs when a deferred field is first read
+        deferred = self.get_deferred_fields()
+        attnames = [
+            field.attname for field in self._meta.concrete_fields
+            if field.attname not in deferred
+            and (fields is None or field.name in fields or field.attname in fields)
+        ]
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is not None:
+            loaded_values.update((attname, getattr(self, attname)) for attname in attnames)
+    
+    def _snapshot(self):
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in self.get_deferred_fields()
+        }
+    
+    def get_loaded_value(self, attname):
+        return self._loaded_values[attname]
+    
+    def _is_dirty(self, attname, deferred):
+        if attname in self._loaded_values:
+            return getattr(self, attname) != self._loaded_values[attname]
+        # Deferred when loaded but assigned since: the row's value is unknown
+        return attname not in deferred
+    
+    def get_dirty_fields(self):
+        """Names of fields whose value differs from the snapshot or was assigned without being loaded"""
+        if getattr(self, '_loaded_values', None) is None:
+            return None
+        deferred = self.get_deferred_fields()
+        return [
+            field.name for field in self._meta.concrete_fields
+            if self._is_dirty(field.attname, deferred)
+        ]
+    
+    def has_tracked_changes(self):
+        if getattr(self, '_loaded_values', None) is None:
+            return False
+        deferred = self.get_deferred_fields()
+        return any(self._is_dirty(attname, deferred) for attname in self.TRACKED_FIELDS)
+    
+    def has_tracked_snapshot(self):
+        """Whether the snapshot holds the previous value of every tracked field"""
+        loaded_values = getattr(self, '_loaded_values', None)
+        return loaded_values is not None and all(attname in loaded_values for attname in self.TRACKED_FIELDS)
+    
+    def save(self, *args, **kwargs):
+        """
+        Writes only the dirty columns (plus updated_at) of a loaded task. A
+        loaded task with nothing dirty isn't written at all: no query, no
+        updated_at bump and no pre_save/post_save signals. Pass
+        update_fields to force a write.
+        """
+        stamp_deletion(self)
+        if self.pk and not self._state.adding and 'update_fields' not in kwargs and not kwargs.get('force_insert'):
+            dirty_fields = self.get_dirty_fields()
+            if dirty_fields is not None:
+                if not dirty_fields:
+                    return
+                # auto_now is only written when it is part of update_fields
+                kwargs['update_fields'] = dirty_fields + ['updated_at']
+        super().save(*args, **kwargs)
+        self._snapshot()
+    
     def delete(self, using=None, keep_parents=False):
         """Soft delete"""
         self.is_deleted = True
         self.save()
+
+
+class TaskArchive(models.Model):
+    """
+    A task moved out of tasks_task by ``manage.py archive_deleted``, under
+    its original id. The foreign keys are plain ids: the project may be
+    archived too and the assignee may be gone by the time it is restored.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    due_date = models.DateTimeField()
+    project_id = models.BigIntegerField()
+    assigned_to_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    # False for live tasks archived along with their deleted project
+    is_deleted = models.BooleanField()
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-archived_at', '-id']
+        indexes = [
+            models.Index(fields=['project_id'], name='taskarchive_project_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
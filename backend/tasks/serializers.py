@@ -1,11 +1,11 @@
 from rest_framework import serializers
+from task_tracker.fieldsets import ExpandableFieldsMixin
 from .models import Task
 from projects.serializers import ProjectSerializer
 from accounts.serializers import UserSerializer
 
-class TaskSerializer(serializers.ModelSerializer):
-    project = ProjectSerializer(read_only=True)
-    assigned_to = UserSerializer(read_only=True)
+class TaskSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
+    expandable_fields = {'project': ProjectSerializer, 'assigned_to': UserSerializer}
     
     class Meta:
         model = Task
@@ -31,3 +31,25 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
             for field_name in list(self.fields.keys()):
                 if field_name not in allowed_fields:
                     self.fields.pop(field_name)
+
+def _known_id(value, known_ids):
+    if value not in known_ids:
+        raise serializers.ValidationError(f'Invalid pk "{value}" - object does not exist.')
+    return value
+
+class TaskBulkCreateSerializer(TaskCreateSerializer):
+    """Checks foreign keys against the ids preloaded into the context instead of one query per item"""
+    project = serializers.IntegerField(source='project_id')
+    assigned_to = serializers.IntegerField(source='assigned_to_id')
+    
+    def validate_project(self, value):
+        return _known_id(value, self.context['project_ids'])
+    
+    def validate_assigned_to(self, value):
+        return _known_id(value, self.context['user_ids'])
+
+class TaskBulkUpdateSerializer(TaskUpdateSerializer):
+    assigned_to = serializers.IntegerField(source='assigned_to_id')
+    
+    def validate_assigned_to(self, value):
+        return _known_id(value, self.context['user_ids'])
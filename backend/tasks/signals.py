@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after bulk_update() changed tracked fields, since it bypasses the
+# model save signals. Arguments: changes, a list of (task, previous values
+# of Task.TRACKED_FIELDS) pairs, and actor, the user who made the changes.
+tasks_bulk_updated = Signal()
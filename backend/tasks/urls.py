@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.urls import path
+from activity_logs.views import TaskHistoryView
 from . import views
 
+if settings.ASYNC_VIEWS:
+    task_list_view, task_detail_view = views.AsyncTaskListCreateView, views.AsyncTaskDetailView
+else:
+    task_list_view, task_detail_view = views.TaskListCreateView, views.TaskDetailView
+
 urlpatterns = [
-    path('', views.TaskListCreateView.as_view(), name='task-list-create'),
-    path('<int:pk>/', views.TaskDetailView.as_view(), name='task-detail'),
+    path('', task_list_view.as_view(), name='task-list-create'),
+    path('<int:pk>/', task_detail_view.as_view(), name='task-detail'),
+    path('<int:pk>/history/', TaskHistoryView.as_view(), name='task-history'),
     path('export/', views.export_tasks, name='export-tasks'),
+    path('stats/', views.task_stats, name='task-stats'),
+    path('bulk/', views.bulk_tasks, name='task-bulk'),
 ]
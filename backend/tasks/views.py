@@ -1,12 +1,25 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
+from django.db.models import Count, Max, Q
 from django.utils import timezone
 from datetime import timedelta
-import json
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from task_tracker.asyncviews import AsyncAPIView, AsyncListModelMixin, AsyncRetrieveModelMixin, aiterate
+from task_tracker.cache import CachedListMixin
+from task_tracker.conditional import ConditionalGetMixin
+from task_tracker.fieldsets import SparseFieldsetMixin
+from task_tracker.pagination import KeysetPagination
+from task_tracker.renderers import ORJSONRenderer
+from task_tracker.search import FullTextSearchFilter
+from .bulk import BulkRequestSerializer, apply_bulk_operations
+from .exports import (
+    EXPORT_CONTENT_TYPES, EXPORT_WRITERS, CSVExportRenderer, NDJSONExportRenderer,
+    export_queryset, gzip_stream,
+)
 from .models import Task
 from .serializers import TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer
 
@@ -29,90 +42,168 @@ class TaskPermission(permissions.BasePermission):
             return True
         
         # Contributors can only access tasks assigned to them
-        return obj.assigned_to == request.user
+        return obj.assigned_to_id == request.user.id
 
-class TaskListCreateView(generics.ListCreateAPIView):
+class TaskPagination(KeysetPagination):
+    ordering = ('-created_at', 'id')
+
+# Covers the tasks and the rows TaskSerializer nests. A project's tasks_count
+# can still lag when tasks outside the response change.
+TASK_VALIDATOR_AGGREGATES = {
+    'count': Count('id'),
+    'updated_at': Max('updated_at'),
+    'project_updated_at': Max('project__updated_at'),
+    'owner_updated_at': Max('project__owner__updated_at'),
+    'assignee_updated_at': Max('assigned_to__updated_at'),
+}
+
+class TaskListCreateView(CachedListMixin, ConditionalGetMixin, SparseFieldsetMixin, generics.ListCreateAPIView):
     permission_classes = [TaskPermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    validator_aggregates = TASK_VALIDATOR_AGGREGATES
+    cache_dependencies = ('task', 'project', 'user')
+    pagination_class = TaskPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['status', 'project', 'assigned_to']
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'due_date', 'status']
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Task.objects.filter(is_deleted=False)
-        if self.request.user.is_contributor:
-            queryset = queryset.filter(assigned_to=self.request.user)
-        return queryset
+        return self.trim_queryset(Task.objects.visible_to(self.request.user))
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return TaskCreateSerializer
         return TaskSerializer
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [TaskPermission]
+    validator_aggregates = TASK_VALIDATOR_AGGREGATES
+    # Checked by TaskPermission
+    required_fields = ('assigned_to',)
     
     def get_queryset(self):
-        queryset = Task.objects.filter(is_deleted=False)
-        if self.request.user.is_contributor:
-            queryset = queryset.filter(assigned_to=self.request.user)
-        return queryset
+        # Only reads render TaskSerializer
+        return self.trim_queryset(Task.objects.visible_to(self.request.user))
     
     def get_serializer_class(self):
         if self.request.method in ['PATCH', 'PUT']:
             return TaskUpdateSerializer
         return TaskSerializer
     
+    def perform_update(self, serializer):
+        # Recorded as the actor in the activity log
+        serializer.instance.changed_by = self.request.user
+        serializer.save()
+    
     def destroy(self, request, *args, **kwargs):
         if not request.user.is_admin:
             return Response({'error': 'Only admins can delete tasks'}, status=status.HTTP_403_FORBIDDEN)
         
         instance = self.get_object()
+        instance.changed_by = request.user
         instance.delete()  # This will soft delete
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-@api_view(['GET'])
+class AsyncTaskListCreateView(AsyncAPIView, TaskListCreateView, AsyncListModelMixin):
+    pass
+
+class AsyncTaskDetailView(AsyncAPIView, TaskDetailView, AsyncRetrieveModelMixin):
+    pass
+
+@api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
-def export_tasks(request):
-    if not request.user.is_admin:
-        return Response({'error': 'Only admins can export tasks'}, status=status.HTTP_403_FORBIDDEN)
+def bulk_tasks(request):
+    """
+    Apply many creates, partial updates and soft deletes in one transaction.
+    Permissions are checked per item with the same rules as the single-task
+    endpoints; if any item fails nothing is applied.
+    """
+    serializer = BulkRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
     
+    ok, results = apply_bulk_operations(serializer.validated_data, request)
+    return Response(results, status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+@permission_classes([TaskPermission])
+def task_stats(request):
     now = timezone.now()
+    open_statuses = ['todo', 'in_progress']
+    counters = {
+        'total': Count('id'),
+        'overdue': Count('id', filter=Q(status__in=open_statuses, due_date__lt=now)),
+        'due_soon': Count('id', filter=Q(
+            status__in=open_statuses,
+            due_date__gte=now,
+            due_date__lte=now + timedelta(hours=48),
+        )),
+    }
+    for value, _label in Task.STATUS_CHOICES:
+        counters[value] = Count('id', filter=Q(status=value))
     
-    # Tasks due in next 48 hours
-    due_soon = Task.objects.filter(
-        is_deleted=False,
-        due_date__gte=now,
-        due_date__lte=now + timedelta(hours=48),
-        status__in=['todo', 'in_progress']
+    # One grouped query; the overall totals are the sum of the per-project rows
+    rows = (
+        Task.objects
+        .visible_to(request.user)
+        .values('project', 'project__title')
+        .annotate(**counters)
+        .order_by('project')
     )
     
-    # Overdue tasks
-    overdue = Task.objects.filter(
-        is_deleted=False,
-        due_date__lt=now,
-        status__in=['todo', 'in_progress']
-    )
+    totals = dict.fromkeys(counters, 0)
+    projects = []
+    for row in rows:
+        for key in counters:
+            totals[key] += row[key]
+        projects.append({
+            'id': row['project'],
+            'title': row['project__title'],
+            'total': row['total'],
+            'by_status': {value: row[value] for value, _label in Task.STATUS_CHOICES},
+            'overdue': row['overdue'],
+            'due_soon': row['due_soon'],
+        })
     
-    # Recently completed (last 24 hours)
-    recently_completed = Task.objects.filter(
-        is_deleted=False,
-        status='done',
-        updated_at__gte=now - timedelta(hours=24)
-    )
+    return Response({
+        'total': totals['total'],
+        'by_status': {value: totals[value] for value, _label in Task.STATUS_CHOICES},
+        'overdue': totals['overdue'],
+        'due_soon': totals['due_soon'],
+        'projects': projects,
+        'generated_at': now.isoformat(),
+    })
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([ORJSONRenderer, NDJSONExportRenderer, CSVExportRenderer])
+def export_tasks(request):
+    if not request.user.is_admin:
+        return Response({'error': 'Only admins can export tasks'}, status=status.HTTP_403_FORBIDDEN,
+                        content_type='application/json')
     
-    data = {
-        'due_soon': TaskSerializer(due_soon, many=True).data,
-        'overdue': TaskSerializer(overdue, many=True).data,
-        'recently_completed': TaskSerializer(recently_completed, many=True).data,
-        'exported_at': now.isoformat()
-    }
+    export_format = request.query_params.get('format', 'json')
+    compress = request.query_params.get('compress') == 'gzip'
+    now = timezone.now()
     
-    response = HttpResponse(
-        json.dumps(data, indent=2),
-        content_type='application/json'
-    )
-    response['Content-Disposition'] = f'attachment; filename="tasks_export_{now.strftime("%Y%m%d_%H%M%S")}.json"'
+    # Due soon, overdue and recently completed tasks are classified in SQL and
+    # streamed in chunks, so memory stays flat regardless of the export size
+    queryset = export_queryset(now)
+    # The rows are read after the view returns, so settle the database
+    # (a read replica, if any) while the request is still being routed
+    queryset = queryset.using(queryset.db)
+    chunks = EXPORT_WRITERS[export_format](queryset, now)
+    if compress:
+        chunks = gzip_stream(chunks)
+    if settings.ASYNC_VIEWS:
+        # ASGI would buffer a sync iterator in full before sending it
+        chunks = aiterate(chunks)
+    filename = f'tasks_export_{now.strftime("%Y%m%d_%H%M%S")}.{export_format}'
+    if compress:
+        response = StreamingHttpResponse(chunks, content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     
     return response
@@ -38,7 +38,9 @@ const ActivityLogs: React.FC = () => {
 
   const fetchActivityLogs = async () => {
     try {
-      const response = await api.get("/activity-logs/");
+      const response = await api.get("/activity-logs/", {
+        params: { expand: "task.project,previous_assignee,updated_by" },
+      });
       setActivityLogs(response.data.results || response.data);
     } catch (error) {
       toast.error("Failed to fetch activity logs");
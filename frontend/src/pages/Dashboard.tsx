@@ -42,28 +42,21 @@ const Dashboard: React.FC = () => {
 
   const fetchDashboardData = async () => {
     try {
-      const [projectsRes, tasksRes] = await Promise.all([
-        api.get("/projects/"),
-        api.get("/tasks/"),
+      const [projectsRes, statsRes] = await Promise.all([
+        api.get("/projects/", { params: { fields: "id" } }),
+        api.get("/tasks/stats/"),
       ]);
 
       const projects = projectsRes.data.results || projectsRes.data;
-      const tasks = tasksRes.data.results || tasksRes.data;
-
-      const now = new Date();
-      const overdue = tasks.filter(
-        (task: any) => new Date(task.due_date) < now && task.status !== "done"
-      );
+      const taskStats = statsRes.data;
 
       setStats({
-        totalProjects: projects.length,
-        totalTasks: tasks.length,
-        todoTasks: tasks.filter((task: any) => task.status === "todo").length,
-        inProgressTasks: tasks.filter(
-          (task: any) => task.status === "in_progress"
-        ).length,
-        doneTasks: tasks.filter((task: any) => task.status === "done").length,
-        overdueTasks: overdue.length,
+        totalProjects: projectsRes.data.count ?? projects.length,
+        totalTasks: taskStats.total,
+        todoTasks: taskStats.by_status.todo,
+        inProgressTasks: taskStats.by_status.in_progress,
+        doneTasks: taskStats.by_status.done,
+        overdueTasks: taskStats.overdue,
       });
     } catch (error) {
       toast.error("Failed to fetch dashboard data");
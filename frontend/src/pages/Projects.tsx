@@ -39,7 +39,9 @@ const Projects: React.FC = () => {
 
   const fetchProjects = async () => {
     try {
-      const response = await api.get("/projects/");
+      const response = await api.get("/projects/", {
+        params: { expand: "owner" },
+      });
       setProjects(response.data.results || response.data);
     } catch (error) {
       console.error("Error fetching projects:", error);
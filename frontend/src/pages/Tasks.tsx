@@ -74,7 +74,9 @@ const Tasks: React.FC = () => {
 
   const fetchTasks = async () => {
     try {
-      const response = await api.get("/tasks/");
+      const response = await api.get("/tasks/", {
+        params: { expand: "project,assigned_to" },
+      });
       setTasks(response.data.results || response.data);
     } catch (error) {
       toast.error("Failed to fetch tasks");
@@ -85,7 +87,9 @@ const Tasks: React.FC = () => {
 
   const fetchProjects = async () => {
     try {
-      const response = await api.get("/projects/");
+      const response = await api.get("/projects/", {
+        params: { fields: "id,title" },
+      });
       setProjects(response.data.results || response.data);
     } catch (error) {
       toast.error("Failed to fetch projects");